@@ -1,25 +1,74 @@
-import subprocess
 import asyncio
+import os
+import subprocess
+import sys
+import time
+from functools import partial
 from textual.app import App, ComposeResult
 from textual.containers import Container, Vertical
 from textual.widgets import Static, Input
 from textual.reactive import reactive
 from textual import log
 from textual import on
+from textual.worker import get_current_worker
 from textual.events import Key
 from textual.binding import Binding
 from textual.widget import Widget
 from textual.timer import Timer
-from message_list import MessageList, MessageSelected, load_messages_from_json
+from message_list import (
+    MessageList, VirtualMessageList, MessageSelected, StoreMessages, iter_messages_from_json
+)
+from message_store import MessageStore
+from message_index import MessageIndex
 from message_viewer import MessageViewer
 from keyboard_commands import KeyboardCommands
 from loading_screen import LoadingScreen
 from debug_widget import DebugWidget
 from gemini_summarizer import GeminiSummarizer
+from local_summarizer import LocalSummarizer
+from summarizer_backend import SummaryError
+from summary_scheduler import SummaryScheduler
+from message_digest import DigestBuilder
 from summary_widget import SummaryWidget
+from tracing import TRACE_ENABLED, span, tracer
+
+JSON_FILE = "top_posters_output.json"
+DB_FILE = "messages.db"
+
+# "virtual" renders only the visible rows; "widgets" mounts one ListItem per message
+MESSAGE_LIST_MODE = os.getenv("MESSAGE_LIST_MODE", "virtual")
+MessageListView = MessageList if MESSAGE_LIST_MODE == "widgets" else VirtualMessageList
+
+def env_number(name: str, default, minimum, cast=int):
+    """
+    Read a numeric setting from the environment.
+
+    Values that are not numbers fall back to default and values below minimum
+    are raised to it, with a warning on stderr (shown once the app exits).
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        number = cast(float(value)) if cast is int else cast(value)
+    except (ValueError, OverflowError):
+        print(f"Warning: {name}={value!r} is not a number, using {default}", file=sys.stderr)
+        return default
+    if number != number or number < minimum:
+        print(f"Warning: {name}={value!r} is below {minimum}, using {minimum}", file=sys.stderr)
+        return minimum
+    return number
+
+# Background summarization: messages on each side of the selection to summarize
+# ahead of time (0 disables prefetching), parallel API calls and calls per minute
+# (0 for no limit)
+SUMMARY_PREFETCH = env_number("SUMMARY_PREFETCH", 1, 0)
+SUMMARY_CONCURRENCY = env_number("SUMMARY_CONCURRENCY", 2, 1)
+SUMMARY_RATE_PER_MINUTE = env_number("SUMMARY_RATE_PER_MINUTE", 15.0, 0.0, float)
 
-# Load messages from JSON file
-MESSAGES = load_messages_from_json("top_posters_output.json")
+# Digest of the listed messages: most messages included, and tokens of posts sent in one API call
+DIGEST_MAX_MESSAGES = env_number("DIGEST_MAX_MESSAGES", 500, 1)
+DIGEST_CHUNK_TOKENS = env_number("DIGEST_CHUNK_TOKENS", 8000, 500)
 
 class FilterInput(Input):
     """A filter input widget that can be shown/hidden"""
@@ -48,6 +97,27 @@ class EmailApp(App):
     # Track if loading is complete
     loading_complete = reactive(False)
     
+    # Seconds to wait after the last keystroke before running a live filter
+    FILTER_DEBOUNCE = 0.15
+    
+    # Seconds the selection must rest before the selected message is rendered in full
+    # (and its summaries prefetched) while it moves quickly, e.g. with an arrow key held
+    SELECTION_SETTLE_DELAY = 0.1
+    
+    # Seconds between refreshes of the span timings in the debug window
+    TRACE_REFRESH_INTERVAL = 1.0
+    
+    # Messages above and below the selection to prerender in the viewer
+    PRERENDER_NEIGHBORS = 2
+    
+    # Minimum seconds between loading screen progress updates
+    LOAD_PROGRESS_INTERVAL = 0.1
+    
+    # Messages to read before showing the list (about one screen), then seconds
+    # between appending further batches while the rest of the data loads
+    LOAD_FIRST_BATCH = 100
+    LOAD_BATCH_INTERVAL = 0.25
+    
     # Define key bindings
     BINDINGS = [
         Binding("q", "quit", "Quit"),
@@ -56,13 +126,44 @@ class EmailApp(App):
         Binding("enter", "open_href", "Open in Browser"),
         Binding("d", "toggle_debug", "Toggle Debug", show=False),
         Binding("s", "summarize", "Summarize Message"),
+        Binding("g", "digest", "Digest Listed Messages"),
         Binding("t", "test_gemini", "Test Gemini Connection", show=False),
     ]
 
+    def __init__(self, json_file: str = JSON_FILE, db_file: str = DB_FILE, **kwargs) -> None:
+        """
+        Args:
+            json_file: Dump written by fetch_posts.py, read when there is no message store
+            db_file: SQLite message store written by fetch_posts.py, preferred if it has messages
+        """
+        super().__init__(**kwargs)
+        self.json_file = json_file
+        self.db_file = db_file
+        # Pending debounce timer for live filtering
+        self.filter_timer: Timer | None = None
+        # Trailing debounce of selection changes, and the message waiting for it
+        self.selection_timer: Timer | None = None
+        self.pending_selection = None
+        # Refreshes the span timings in the debug widget while it is shown
+        self.trace_timer: Timer | None = None
+        # (query, index positions) of the filter currently shown, used for narrowing
+        self.last_filter = ("", None)
+        # Filled in by the loading worker: records read from the dump, or StoreMessages
+        # reading them from the store on demand
+        self.messages = []
+        # Id of the message whose summary is being generated for the summary widget
+        self.summary_message_id = None
+        # Whether the summary widget shows a digest (finished or still being built)
+        self.digest_shown = False
+        # SQLite store written by fetch_posts.py, if there is one with messages in it
+        self.message_store: MessageStore | None = None
+        # Token index for filtering when there is no SQLite store to search
+        self.message_index: MessageIndex | None = None
+
     def compose(self) -> ComposeResult:
         with Container(id="main"):
             with Container(id="content-area"):
-                yield MessageList(MESSAGES, id="message-list")
+                yield MessageListView(id="message-list")
                 yield MessageViewer(id="message-viewer")
             yield SummaryWidget(id="summary-widget")
             yield FilterInput(id="filter-input")
@@ -74,54 +175,163 @@ class EmailApp(App):
         """Called when the app is mounted - show loading screen first"""
         # Initialize Gemini summarizer
         self.gemini_summarizer = GeminiSummarizer()
+        # Instant offline summaries, shown while Gemini works or instead of it
+        self.local_summarizer = LocalSummarizer()
+        self.summary_scheduler = SummaryScheduler(
+            self.gemini_summarizer, concurrency=SUMMARY_CONCURRENCY, rate_per_minute=SUMMARY_RATE_PER_MINUTE
+        )
+        self.run_worker(self.summary_scheduler.run(), name="summary-scheduler", group="summaries")
+        # Digests share the scheduler's rate limit, so they never exceed the API quota together
+        self.digest_builder = DigestBuilder(
+            self.gemini_summarizer, limiter=self.summary_scheduler.bucket,
+            concurrency=SUMMARY_CONCURRENCY, chunk_tokens=DIGEST_CHUNK_TOKENS,
+        )
         
         # Initially hide the main interface and show loading screen
         self.hide_main_interface()
         self.show_loading_screen()
         
-        # Start loading messages asynchronously
-        self.call_after_refresh(self.load_messages_async)
+        # Read the messages in a worker so the loading screen is painted right away
+        self.run_worker(self.load_messages_worker, name="load-messages", group="load", thread=True)
         
         # Store reference to message list for later use
-        self.message_list = self.query_one("#message-list", MessageList)
+        self.message_list = self.query_one("#message-list", MessageListView)
     
-    async def load_messages_async(self) -> None:
-        """Load messages asynchronously and transition to main interface when complete"""
+    def load_messages_worker(self) -> None:
+        """
+        Load messages in a worker thread, reporting progress as they are read.
+        
+        Prefers the SQLite store written by fetch_posts.py, whose messages are
+        read a page at a time as the list shows them, so nothing is loaded up
+        front. Otherwise the JSON dump is streamed and the token index used for
+        filtering is built here too; the list is then shown as soon as the first
+        batch is read and later batches are appended while the rest loads.
+        """
+        worker = get_current_worker()
+        last_report = 0.0
+        
+        def report(text: str, force: bool = False) -> None:
+            nonlocal last_report
+            now = time.monotonic()
+            if force or now - last_report >= self.LOAD_PROGRESS_INTERVAL:
+                last_report = now
+                self.call_from_thread(self.show_load_progress, text)
+        
         try:
-            # Check if the JSON file exists and has content
-            import os
-            json_file = "top_posters_output.json"
+            report("Checking message data...", force=True)
+            store = MessageStore(self.db_file) if os.path.exists(self.db_file) else None
+            if store is not None and not store.count():
+                store.close()
+                store = None
             
-            # Update loading message to show we're checking the file
-            loading_screen = self.query_one("#loading-screen", LoadingScreen)
-            loading_screen.update("⠋ Checking message data...")
+            if store is not None:
+                # Rows are read from the store as the list shows them. The first page is read
+                # here (and cached) rather than on the UI thread.
+                messages = StoreMessages(store)
+                messages[0]
+                self.call_from_thread(self.start_loading, store, None)
+                self.call_from_thread(self.show_stored_messages, messages)
+                if not worker.is_cancelled:
+                    self.call_from_thread(self.finish_loading)
+                return
             
-            if not os.path.exists(json_file):
-                self.handle_loading_error(f"JSON file '{json_file}' not found")
+            if not os.path.exists(self.json_file):
+                self.call_from_thread(self.handle_loading_error, f"JSON file '{self.json_file}' not found")
                 return
             
             # Check file size to ensure it has content
-            file_size = os.path.getsize(json_file)
-            if file_size == 0:
-                self.handle_loading_error(f"JSON file '{json_file}' is empty")
+            if os.path.getsize(self.json_file) == 0:
+                self.call_from_thread(self.handle_loading_error, f"JSON file '{self.json_file}' is empty")
                 return
             
-            # Update loading message to show we're processing
-            loading_screen.update("⠙ Processing messages...")
-            
-            # Small delay to show loading animation (can be adjusted)
-            await asyncio.sleep(0.3)
+            message_index = MessageIndex()
+            messages = iter_messages_from_json(
+                self.json_file,
+                progress=lambda parsed, total: report(
+                    f"Reading {self.json_file}: {parsed / 1024 / 1024:.1f}/{total / 1024 / 1024:.1f} MB..."
+                ),
+                keep_bodies=True,
+            )
+            self.call_from_thread(self.start_loading, store, message_index)
             
-            # Check if messages loaded successfully
-            if MESSAGES:
-                # Transition to main interface
-                self.transition_to_main_interface()
-            else:
-                # Handle case where no messages were loaded
-                self.handle_no_messages()
+            batch = []
+            shown = False
+            last_batch = time.monotonic()
+            started = time.perf_counter()
+            for message in messages:
+                if worker.is_cancelled:
+                    return
+                message_index.add(message)
+                # Indexed; from now on the body is read from the dump on demand
+                message.release()
+                batch.append(message)
+                if shown:
+                    if time.monotonic() - last_batch < self.LOAD_BATCH_INTERVAL:
+                        continue
+                elif len(batch) < self.LOAD_FIRST_BATCH:
+                    continue
+                self.call_from_thread(self.append_loaded_messages, batch)
+                batch = []
+                shown = True
+                last_batch = time.monotonic()
+            if batch:
+                self.call_from_thread(self.append_loaded_messages, batch)
+            tracer.record("ingest", time.perf_counter() - started)
         except Exception as e:
             log.error(f"Error loading messages: {e}")
-            self.handle_loading_error(str(e))
+            self.call_from_thread(self.handle_loading_error, str(e))
+            return
+        
+        if not worker.is_cancelled:
+            self.call_from_thread(self.finish_loading)
+    
+    def show_load_progress(self, text: str) -> None:
+        """Show loading progress on the loading screen, or in the debug widget once the list is up"""
+        if self.loading_complete:
+            self.query_one("#debug-widget", DebugWidget).update_debug_info(text)
+        else:
+            self.query_one("#loading-screen", LoadingScreen).set_progress(text)
+    
+    def start_loading(self, store: MessageStore | None, message_index: MessageIndex | None) -> None:
+        """Make the store or the (still growing) token index available for filtering"""
+        self.message_store = store
+        self.message_index = message_index
+    
+    def show_stored_messages(self, messages: StoreMessages) -> None:
+        """Show the messages of the store, which the list reads a page at a time as it is scrolled"""
+        self.messages = messages
+        self.query_one("#message-list", MessageListView).update_messages(messages)
+        self.transition_to_main_interface()
+    
+    def append_loaded_messages(self, batch: list) -> None:
+        """Add a batch of freshly loaded messages, showing the main interface with the first one"""
+        with span("ingest.append"):
+            # Extended in place: the message lists keep copies of their own
+            self.messages.extend(batch)
+            
+            # Positions from before this batch can't be used to narrow the next query
+            self.last_filter = (self.last_filter[0], None)
+            if not self.last_filter[0]:
+                self.query_one("#message-list", MessageListView).append_messages(batch)
+        
+        if not self.loading_complete:
+            self.transition_to_main_interface()
+    
+    def finish_loading(self) -> None:
+        """Called once every message has been read"""
+        if not self.messages:
+            # Handle case where no messages were loaded
+            self.handle_no_messages()
+            return
+        
+        debug_widget = self.query_one("#debug-widget", DebugWidget)
+        debug_widget.update_debug_info(f"Loaded {len(self.messages)} messages")
+        
+        # A filter applied while loading only saw part of the messages; run it again
+        filter_text = self.last_filter[0]
+        if filter_text:
+            self.last_filter = ("", None)
+            self.live_filter(filter_text)
     
     def handle_no_messages(self) -> None:
         """Handle case where no messages were loaded"""
@@ -131,6 +341,11 @@ class EmailApp(App):
     
     def handle_loading_error(self, error_msg: str) -> None:
         """Handle loading errors"""
+        if self.loading_complete:
+            # Part of the messages are already shown; keep them and report the error
+            debug_widget = self.query_one("#debug-widget", DebugWidget)
+            debug_widget.update_debug_info(f"Error loading messages: {error_msg}")
+            return
         loading_screen = self.query_one("#loading-screen", LoadingScreen)
         loading_screen.update_message(f"Error loading messages: {error_msg}\nPress 'q' to quit.")
         # Keep loading screen visible with error message
@@ -181,9 +396,9 @@ class EmailApp(App):
         self.show_main_interface()
         
         # Initialize the app as before
-        if MESSAGES:
+        if self.messages:
             # Get the message list widget
-            message_list = self.query_one("#message-list", MessageList)
+            message_list = self.query_one("#message-list", MessageListView)
             # Select the first item (index 0)
             message_list.index = 0
             # Give focus to the message list
@@ -194,19 +409,84 @@ class EmailApp(App):
 
     @on(MessageSelected)
     def on_message_selected(self, event: MessageSelected) -> None:
-        log.info(f"on_message_selected called with item: {event.item}")
+        """
+        Show the selected message, coalescing rapid selection changes.
+        
+        The first selection after a pause is shown in full at once. While the
+        selection keeps moving (e.g. an arrow key held down) only the header of
+        each row is shown, and the message the cursor settles on is shown in
+        full SELECTION_SETTLE_DELAY seconds after the last change.
+        """
+        # A summary still being generated belongs to the previous message
+        if self.summary_message_id != event.item["id"]:
+            self.cancel_summary()
+        if self.selection_timer is None:
+            self.pending_selection = None
+            self.show_selected_message(event.item)
+        else:
+            self.selection_timer.stop()
+            self.pending_selection = event.item
+            self.query_one("#message-viewer", MessageViewer).show_header(event.item)
+        self.selection_timer = self.set_timer(self.SELECTION_SETTLE_DELAY, self.settle_selection)
+    
+    def settle_selection(self) -> None:
+        """Show the message the selection stopped on in full, if only its header is shown"""
+        self.selection_timer = None
+        message = self.pending_selection
+        self.pending_selection = None
+        if message is not None:
+            self.show_selected_message(message)
+    
+    def show_selected_message(self, message: dict) -> None:
+        """Render the selected message, prepare its neighbors and update the summary panel"""
         viewer = self.query_one("#message-viewer", MessageViewer)
         debug_widget = self.query_one("#debug-widget", DebugWidget)
-        log.info(f"Found viewer: {viewer}")
-        viewer.set_message(event.item)
-        debug_widget.update_debug_info(f"Selected: {event.item['subject'][:50]}...")
-        log.info("Set viewer content")
+        viewer.set_message(message)
+        debug_widget.update_debug_info(f"Selected: {message['subject'][:50]}...")
+        
+        # Render the messages around the selection ahead of time
+        message_list = self.query_one("#message-list", MessageListView)
+        if message_list.index is not None:
+            start = max(0, message_list.index - self.PRERENDER_NEIGHBORS)
+            end = message_list.index + self.PRERENDER_NEIGHBORS + 1
+            viewer.prerender(message_list.messages[start:end])
+            self.prefetch_summaries(message_list.messages, message_list.index)
         
-        # Hide summary when a new message is selected
+        # Keep the summary open if the new message was summarized before, otherwise hide it.
+        # A digest covers the whole list, so it stays open while browsing, and a summary
+        # requested before the selection settled is already for this message.
         summary_widget = self.query_one("#summary-widget", SummaryWidget)
-        if summary_widget:
+        if summary_widget and not self.digest_shown and self.summary_message_id != message["id"]:
+            if summary_widget.styles.display != "none":
+                # The summary cache is SQLite, so look it up in a worker rather than on the UI thread
+                self.run_worker(
+                    self.show_cached_summary(message), name="cached-summary", group="summarize", exclusive=True
+                )
+            else:
+                summary_widget.hide_summary()
+    
+    async def show_cached_summary(self, message: dict) -> None:
+        """Keep the summary panel open with the message's cached summary, or hide it if there is none"""
+        cached = await asyncio.to_thread(self.gemini_summarizer.cached_summary, message)
+        if self.digest_shown or self.summary_message_id is not None:
+            # A digest or a summary took over the panel meanwhile
+            return
+        summary_widget = self.query_one("#summary-widget", SummaryWidget)
+        if cached is not None:
+            summary_widget.set_summary(cached)
+        else:
             summary_widget.hide_summary()
 
+    def prefetch_summaries(self, messages: list, index: int) -> None:
+        """Queue background summaries for the selected message and its neighbors, nearest first"""
+        if SUMMARY_PREFETCH <= 0 or not self.gemini_summarizer.is_available():
+            return
+        positions = [index]
+        for distance in range(1, SUMMARY_PREFETCH + 1):
+            positions += [index + distance, index - distance]
+        selected = messages[index] if 0 <= index < len(messages) else None
+        self.summary_scheduler.prefetch([messages[i] for i in positions if 0 <= i < len(messages)], selected=selected)
+
     def action_filter(self) -> None:
         """Action to show filter input"""
         log.info("Filter action triggered")
@@ -224,13 +504,13 @@ class EmailApp(App):
         log.info("action_open_href called")
         
         # Get the currently selected message
-        message_list = self.query_one("#message-list", MessageList)
+        message_list = self.query_one("#message-list", MessageListView)
         log.info(f"Message list index: {message_list.index}")
         log.info(f"Message list length: {len(message_list.messages)}")
         
         if message_list.index is not None and 0 <= message_list.index < len(message_list.messages):
             selected_message = message_list.messages[message_list.index]
-            log.info(f"Selected message: {selected_message}")
+            log.info(f"Selected message: {selected_message['id']}")
             
             if "viewHref" in selected_message and selected_message["viewHref"]:
                 href = selected_message["viewHref"]
@@ -268,22 +548,34 @@ class EmailApp(App):
             # Show Gemini status when debug is first shown
             gemini_status = self.gemini_summarizer.get_status_message()
             debug_widget.update_debug_info(f"Debug window shown | {gemini_status}")
+            # Time the hot paths while the debug window is open
+            tracer.enabled = True
+            self.show_trace_stats()
+            self.trace_timer = self.set_interval(self.TRACE_REFRESH_INTERVAL, self.show_trace_stats)
         else:
             debug_widget.styles.display = "none"
             debug_widget.update_debug_info("Debug window hidden")
+            tracer.enabled = TRACE_ENABLED
+            if self.trace_timer is not None:
+                self.trace_timer.stop()
+                self.trace_timer = None
+    
+    def show_trace_stats(self) -> None:
+        """Show p50/p95/max of the recorded spans in the debug widget"""
+        self.query_one("#debug-widget", DebugWidget).update_trace_stats(tracer.stats())
     
     def action_summarize(self) -> None:
         """Action to summarize the currently selected message using Gemini"""
         log.info("Summarize action triggered")
         
         # Get the currently selected message
-        message_list = self.query_one("#message-list", MessageList)
+        message_list = self.query_one("#message-list", MessageListView)
         log.info(f"Message list index: {message_list.index}")
         log.info(f"Message list length: {len(message_list.messages)}")
         
         if message_list.index is not None and 0 <= message_list.index < len(message_list.messages):
             selected_message = message_list.messages[message_list.index]
-            log.info(f"Selected message for summarization: {selected_message}")
+            log.info(f"Selected message for summarization: {selected_message['id']}")
             
             # Check if summary is already visible - if so, hide it
             summary_widget = self.query_one("#summary-widget", SummaryWidget)
@@ -292,6 +584,8 @@ class EmailApp(App):
             
             if summary_widget.styles.display != "none":
                 log.info("Summary already visible, hiding it")
+                self.cancel_summary()
+                self.cancel_digest()
                 summary_widget.hide_summary()
                 debug_widget = self.query_one("#debug-widget", DebugWidget)
                 debug_widget.update_debug_info("Summary hidden")
@@ -302,8 +596,11 @@ class EmailApp(App):
             summary_widget.show_summary()
             summary_widget.set_loading(True)
             
-            # Start async summarization
-            self.call_after_refresh(self.summarize_message_async, selected_message)
+            # Start async summarization in a worker so the UI keeps repainting while it streams
+            self.summary_message_id = selected_message["id"]
+            self.run_worker(
+                self.summarize_message_async(selected_message), name="summarize", group="summarize", exclusive=True
+            )
             
             debug_widget = self.query_one("#debug-widget", DebugWidget)
             debug_widget.update_debug_info("Generating summary with Gemini...")
@@ -314,14 +611,42 @@ class EmailApp(App):
     
     async def summarize_message_async(self, message_data: dict) -> None:
         """Asynchronously summarize a message using Gemini"""
+        message_id = message_data["id"]
         try:
             log.info("Starting message summarization")
+            summary_widget = self.query_one("#summary-widget", SummaryWidget)
             
-            # Generate summary
-            summary = await self.gemini_summarizer.summarize_message(message_data)
+            # Show Gemini's summary if it is cached, otherwise a local summary right away.
+            # The cache is SQLite, so it is read off the UI thread.
+            cached = await asyncio.to_thread(self.gemini_summarizer.cached_summary, message_data)
+            if cached is not None:
+                summary_widget.set_summary(cached)
+                self.query_one("#debug-widget", DebugWidget).update_debug_info("Showing cached summary")
+                return
+            with span("summarize.local"):
+                local_summary = self.local_summarizer.summarize(message_data)
+            if not self.gemini_summarizer.is_available():
+                summary_widget.set_preview(
+                    local_summary or "No text to summarize.",
+                    f"Local summary | {self.gemini_summarizer.get_status_message()}",
+                )
+                debug_widget = self.query_one("#debug-widget", DebugWidget)
+                debug_widget.update_debug_info("Showing local summary (Gemini not available)")
+                return
+            if local_summary:
+                summary_widget.set_preview(local_summary, "Quick local summary, waiting for Gemini...")
+            
+            # Generate summary, ahead of any queued prefetch work (or reuse a prefetch in flight),
+            # streaming the partial text into the summary widget as it arrives. The future is
+            # shielded so cancelling this worker leaves a running API call to finish into the cache.
+            summary = await asyncio.shield(
+                self.summary_scheduler.request(message_data, on_chunk=summary_widget.stream_summary)
+            )
+            if self.summary_message_id != message_id:
+                # Selection moved on; the result is cached for when it is viewed again
+                return
             
             # Update summary widget
-            summary_widget = self.query_one("#summary-widget", SummaryWidget)
             summary_widget.set_summary(summary)
             
             # Update debug info
@@ -330,17 +655,96 @@ class EmailApp(App):
             
             log.info("Message summarization completed")
             
+        except asyncio.CancelledError:
+            log.info(f"Summarization for message {message_id} cancelled")
+            raise
         except Exception as e:
             log.error(f"Error during summarization: {e}")
+            error = str(e) if isinstance(e, SummaryError) else f"Error generating summary: {str(e)}"
             
-            # Show error in summary widget
+            # Show error in summary widget, keeping the local summary if there is one
             summary_widget = self.query_one("#summary-widget", SummaryWidget)
-            summary_widget.set_summary(f"Error generating summary: {str(e)}")
+            if summary_widget.preview_text is not None:
+                summary_widget.set_preview(summary_widget.preview_text, f"Local summary | {error}")
+            else:
+                summary_widget.set_summary(error)
             
             # Update debug info
             debug_widget = self.query_one("#debug-widget", DebugWidget)
             debug_widget.update_debug_info(f"Summarization error: {str(e)}")
     
+    def cancel_summary(self) -> None:
+        """
+        Stop generating the summary shown in the summary widget.
+        
+        A request still queued is dropped; one already sent to Gemini finishes in
+        the background and its result goes to the cache instead of the screen.
+        """
+        if self.summary_message_id is not None:
+            self.summary_scheduler.release(self.summary_message_id)
+            self.summary_message_id = None
+        self.workers.cancel_group(self, "summarize")
+    
+    def action_digest(self) -> None:
+        """Action to build a digest of all messages in the list, i.e. everything matching the filter"""
+        log.info("Digest action triggered")
+        summary_widget = self.query_one("#summary-widget", SummaryWidget)
+        debug_widget = self.query_one("#debug-widget", DebugWidget)
+        
+        if self.digest_shown:
+            self.cancel_digest()
+            summary_widget.hide_summary()
+            debug_widget.update_debug_info("Digest hidden")
+            return
+        
+        message_list = self.query_one("#message-list", MessageListView)
+        messages = message_list.messages
+        if not messages:
+            debug_widget.update_debug_info("No messages to digest")
+            return
+        if not self.gemini_summarizer.is_available():
+            debug_widget.update_debug_info(self.gemini_summarizer.get_status_message())
+            return
+        
+        total = len(messages)
+        messages = messages[:DIGEST_MAX_MESSAGES]
+        title = f"AI Digest of {len(messages)} messages"
+        if total > len(messages):
+            title += f" (first {len(messages)} of {total}, see DIGEST_MAX_MESSAGES)"
+        
+        self.cancel_summary()
+        self.digest_shown = True
+        summary_widget.show_summary(title)
+        summary_widget.set_progress(f"Preparing {len(messages)} messages...")
+        self.run_worker(self.digest_async(messages), name="digest", group="digest", exclusive=True)
+        debug_widget.update_debug_info(f"Building digest of {len(messages)} messages with Gemini...")
+    
+    async def digest_async(self, messages: list) -> None:
+        """Build a digest of messages, showing progress and then the digest in the summary widget"""
+        summary_widget = self.query_one("#summary-widget", SummaryWidget)
+        debug_widget = self.query_one("#debug-widget", DebugWidget)
+        started = time.monotonic()
+        try:
+            digest = await self.digest_builder.build(
+                messages, on_progress=summary_widget.set_progress, on_chunk=summary_widget.stream_summary
+            )
+            summary_widget.set_summary(digest)
+            debug_widget.update_debug_info(
+                f"Digest of {len(messages)} messages generated in {time.monotonic() - started:.1f}s"
+            )
+        except asyncio.CancelledError:
+            log.info("Digest cancelled")
+            raise
+        except Exception as e:
+            log.error(f"Error building digest: {e}")
+            summary_widget.set_summary(f"Error generating digest: {str(e)}")
+            debug_widget.update_debug_info(f"Digest error: {str(e)}")
+    
+    def cancel_digest(self) -> None:
+        """Stop building the digest shown in the summary widget, if any"""
+        self.digest_shown = False
+        self.workers.cancel_group(self, "digest")
+    
     def action_test_gemini(self) -> None:
         """Action to test the Gemini API connection"""
         log.info("Test Gemini action triggered")
@@ -387,7 +791,7 @@ class EmailApp(App):
         filter_input.show()
         self.filter_mode = True
         debug_widget = self.query_one("#debug-widget", DebugWidget)
-        debug_widget.update_debug_info("Filter mode: Type to filter, Enter to apply, Esc to cancel")
+        debug_widget.update_debug_info("Filter mode: Type to filter, Enter to keep, Esc to cancel")
     
     def hide_filter(self) -> None:
         """Hide the filter input and clear filter"""
@@ -395,9 +799,16 @@ class EmailApp(App):
         filter_input.hide()
         self.filter_mode = False
         
+        # Drop any pending or running live filter so it can't re-apply afterwards
+        if self.filter_timer is not None:
+            self.filter_timer.stop()
+            self.filter_timer = None
+        self.workers.cancel_group(self, "filter")
+        self.last_filter = ("", None)
+        
         # Clear filter and show all messages
-        message_list = self.query_one("#message-list", MessageList)
-        message_list.update_messages(MESSAGES)
+        message_list = self.query_one("#message-list", MessageListView)
+        message_list.update_messages(self.messages)
         
         # Give focus back to the message list
         message_list.focus()
@@ -405,43 +816,96 @@ class EmailApp(App):
         debug_widget = self.query_one("#debug-widget", DebugWidget)
         debug_widget.update_debug_info("Filter cleared")
     
+    def match_messages(self, filter_text: str) -> tuple:
+        """
+        Find the messages matching filter_text.
+
+        When filter_text extends the previous query, the previous matches are
+        narrowed down instead of searching the whole index again. Safe to call
+        from a worker thread.
+
+        Returns:
+            (matching messages, their positions in the token index or None)
+        """
+        if not filter_text:
+            return self.messages, None
+        
+        if self.message_store is not None:
+            # Full-text search through the SQLite FTS index; the matches are read a page at a time too
+            return StoreMessages(self.message_store, self.message_store.search(filter_text)), None
+        
+        # AND/prefix match against the token index built at load time
+        previous_text, previous_positions = self.last_filter
+        within = None
+        if previous_positions is not None and previous_text and filter_text.startswith(previous_text):
+            within = previous_positions
+        message_index = self.message_index
+        if message_index is None:
+            return [], None
+        positions = message_index.search_positions(filter_text, within)
+        return [message_index.messages[position] for position in positions], positions
+    
+    def apply_filter(self, filter_text: str, filtered_messages: list, positions) -> None:
+        """Show the result of match_messages in the message list"""
+        self.last_filter = (filter_text, positions)
+        
+        message_list = self.query_one("#message-list", MessageListView)
+        message_list.update_messages(filtered_messages)
+        
+        debug_widget = self.query_one("#debug-widget", DebugWidget)
+        if filter_text:
+            log.info(f"Found {len(filtered_messages)} matching messages")
+            debug_widget.update_debug_info(f"Filtered to {len(filtered_messages)} messages for '{filter_text}'")
+        else:
+            log.info("Filter text is empty, showing all messages")
+            debug_widget.update_debug_info("Filter cleared")
+    
+    def live_filter(self, filter_text: str) -> None:
+        """Run the filter in a worker thread; a newer keystroke cancels an older run"""
+        self.filter_timer = None
+        self.run_worker(
+            partial(self.live_filter_worker, filter_text),
+            name="live-filter",
+            group="filter",
+            exclusive=True,
+            thread=True,
+        )
+    
+    def live_filter_worker(self, filter_text: str) -> None:
+        with span("filter"):
+            filtered_messages, positions = self.match_messages(filter_text)
+        if not get_current_worker().is_cancelled:
+            self.call_from_thread(self.apply_filter, filter_text, filtered_messages, positions)
+    
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Filter as you type, debounced so a burst of keystrokes filters once"""
+        if not self.filter_mode:
+            return
+        
+        if self.filter_timer is not None:
+            self.filter_timer.stop()
+        filter_text = event.value.lower().strip()
+        self.filter_timer = self.set_timer(self.FILTER_DEBOUNCE, partial(self.live_filter, filter_text))
+    
     def on_input_submitted(self, event: Input.Submitted) -> None:
         """Handle filter input submission"""
         if self.filter_mode:
             log.info(f"Input submitted with value: '{event.value}'")
-            log.info(f"Input value type: {type(event.value)}")
-            log.info(f"Input value length: {len(event.value) if event.value else 0}")
             
             filter_text = event.value.lower().strip()
             
+            # Apply the final query now rather than waiting for a pending live run
+            if self.filter_timer is not None:
+                self.filter_timer.stop()
+                self.filter_timer = None
+            self.workers.cancel_group(self, "filter")
+            
             log.info(f"Filtering with text: '{filter_text}'")
-            log.info(f"Total messages before filtering: {len(MESSAGES)}")
+            log.info(f"Total messages before filtering: {len(self.messages)}")
             
-            if filter_text:
-                # Filter messages
-                filtered_messages = []
-                for i, msg in enumerate(MESSAGES):
-                    # Convert message to string and search entire content
-                    msg_str = str(msg).lower()
-                    if filter_text in msg_str:
-                        filtered_messages.append(msg)
-                        log.info(f"Found match in message: {msg['subject'][:50]}...")
-                
-                log.info(f"Found {len(filtered_messages)} matching messages")
-                
-                message_list = self.query_one("#message-list", MessageList)
-                message_list.update_messages(filtered_messages)
-                
-                debug_widget = self.query_one("#debug-widget", DebugWidget)
-                debug_widget.update_debug_info(f"Filtered to {len(filtered_messages)} messages for '{filter_text}'")
-            else:
-                # Empty filter, show all messages
-                log.info("Filter text is empty, showing all messages")
-                message_list = self.query_one("#message-list", MessageList)
-                message_list.update_messages(MESSAGES)
-                
-                debug_widget = self.query_one("#debug-widget", DebugWidget)
-                debug_widget.update_debug_info("Filter cleared")
+            with span("filter"):
+                filtered_messages, positions = self.match_messages(filter_text)
+            self.apply_filter(filter_text, filtered_messages, positions)
             
             # Hide the filter input but don't clear the filter
             filter_input = self.query_one("#filter-input", FilterInput)
@@ -2,9 +2,11 @@
 # src. https://community.khoros.com/discussions/studio/can-someone-walk-me-through-authenticating-and-using-postman-with-aurora/765348
 
 import os
+import json
 import time
 import base64
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,11 +14,69 @@ load_dotenv()
 # Load environment variables
 session_key = os.getenv("sessionKey", "")
 hostname = os.getenv("hostname")
+# "http" only for a local stand-in such as mock_khoros.py
+scheme = os.getenv("scheme", "https")
 tapestry = os.getenv("tapestry")
 username = os.getenv("username")
 password = os.getenv("password")
 session_start_time = int(os.getenv("sessionStartTime") or "0")
 session_last_used = int(os.getenv("sessionLastUsed") or "0")
+# Session key and timestamps are kept here between runs; set it to "" to always log in
+session_cache_file = os.getenv("sessionCacheFile", ".khoros_session.json")
+
+# Shared HTTP client: connections to the community are kept alive and reused
+# by the login and every GraphQL request instead of reconnecting each time
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+http_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+def get_http_session():
+    """Get the shared, pooled HTTP session."""
+    return http_session
+
+def load_session_cache():
+    """Restore the session key and timestamps saved by an earlier run for the same community and user."""
+    global session_key, session_start_time, session_last_used
+
+    if not session_cache_file or not os.path.exists(session_cache_file):
+        return
+    try:
+        with open(session_cache_file, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError) as e:
+        print("Ignoring unreadable session cache:", e)
+        return
+    if cached.get("hostname") != hostname or cached.get("username") != username:
+        return
+
+    session_key = cached.get("sessionKey", "")
+    session_start_time = int(cached.get("sessionStartTime") or 0)
+    session_last_used = int(cached.get("sessionLastUsed") or 0)
+
+def save_session_cache():
+    """Save the session key and timestamps, readable by the current user only."""
+    if not session_cache_file:
+        return
+    cached = {
+        "hostname": hostname,
+        "username": username,
+        "sessionKey": session_key,
+        "sessionStartTime": session_start_time,
+        "sessionLastUsed": session_last_used,
+    }
+    tmp_file = f"{session_cache_file}.tmp"
+    try:
+        # Created with 0600 so the key is never readable by others, not even briefly
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cached, f)
+        os.chmod(tmp_file, 0o600)
+        os.replace(tmp_file, session_cache_file)
+    except OSError as e:
+        print("Could not save session cache:", e)
+
+if not session_key:
+    load_session_cache()
 
 def get_auth_token():
     """Get the authentication token, re-authenticating if necessary."""
@@ -41,24 +101,49 @@ def get_auth_token():
     # Update last used time
     os.environ["sessionLastUsed"] = str(now)
     session_last_used = now
+    save_session_cache()
     
     return session_key
 
+def clear_session():
+    """Forget the session key, in memory and in the session cache, e.g. after the server rejected it."""
+    global session_key, session_start_time, session_last_used
+
+    session_key = ""
+    session_start_time = 0
+    session_last_used = 0
+    for name in ("sessionKey", "sessionStartTime", "sessionLastUsed"):
+        os.environ[name] = ""
+    if session_cache_file and os.path.exists(session_cache_file):
+        try:
+            os.remove(session_cache_file)
+        except OSError as e:
+            print("Could not remove session cache:", e)
+
+def renew_auth_token():
+    """Log in again regardless of the session's age, e.g. after a 401, and return the new token."""
+    clear_session()
+    return get_auth_token()
+
 def get_hostname():
     """Get the hostname from environment variables."""
     return hostname
 
+def get_scheme():
+    """Get the URL scheme (https unless overridden for a local server)."""
+    return scheme
+
 def authenticate():
     """Authenticate and get a new session key."""
     global session_key, session_start_time
     
     url = (
-        f"https://{hostname}/{tapestry}/s/restapi/vc/authentication/sessions/login"
+        f"{scheme}://{hostname}/{tapestry}/s/restapi/vc/authentication/sessions/login"
         f"?user.login={username}&user.password={password}&restapi.response_format=json"
     )
 
     try:
-        response = requests.post(url)
+        response = http_session.post(url, timeout=30)
         response.raise_for_status()
         data = response.json()
 
@@ -67,7 +152,6 @@ def authenticate():
             raise Exception("Authentication failed")
         else:
             new_key = data["response"]["value"]["$"]
-            print("key", new_key)
 
             # Update environment variables
             os.environ["sessionKey"] = new_key
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Headless benchmarks of the TUI on synthetic Khoros dumps.
+
+Generates dumps in the top_posters_output.json shape (1k, 10k and 100k
+messages by default, with realistic HTML bodies; cached in --data-dir) and
+drives EmailApp through Textual's pilot, timing:
+
+- startup: app ready, first frame painted, message list shown and all messages loaded
+- filter: live filtering while typing, submitting the filter and clearing it
+- navigation: N arrow-key steps down the list
+- viewer: rendering message bodies without the render cache
+
+The spans recorded by the tracer during each run are included too. Results
+are written as JSON (--output) so runs can be compared over time. No Gemini
+calls are made.
+
+Usage:
+    python bench_app.py
+    python bench_app.py --sizes 1000 10000 --steps 50 --output bench_results.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from textual import events
+
+from bench_data import dump_path, git_commit
+
+BENCH_SIZES = [1000, 10000, 100000]
+
+# Matches roughly one message in eight in the synthetic dumps
+FILTER_QUERY = "passkey"
+
+def percentiles(values: list) -> dict:
+    values = sorted(values)
+    count = len(values)
+    if not count:
+        return {"count": 0}
+    return {
+        "count": count,
+        "mean": sum(values) / count,
+        "p50": values[(count - 1) // 2],
+        "p95": values[int((count - 1) * 0.95)],
+        "max": values[-1],
+    }
+
+
+async def wait_until(pilot, condition, timeout: float = 120.0) -> float:
+    """Pause until condition() is true; returns the time it took"""
+    start = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError("Benchmark step timed out")
+        await pilot.pause(0.005)
+    return time.perf_counter() - start
+
+
+async def bench_size(app_module, path: str, count: int, args) -> dict:
+    """Run every benchmark against a fresh app reading the dump at path"""
+    from message_viewer import MessageViewer
+    from tracing import tracer
+
+    tracer.clear()
+    result = {"messages": count, "dump_bytes": os.path.getsize(path), "list_mode": app_module.MESSAGE_LIST_MODE}
+    first_frame = []
+
+    class TimedApp(app_module.EmailApp):
+        def on_mount(self) -> None:
+            # call_after_refresh runs once the screen has been refreshed, i.e. the first frame painted
+            self.call_after_refresh(lambda: first_frame.append(time.perf_counter()))
+
+    app = TimedApp(json_file=path, db_file=os.path.join(args.data_dir, "no-store.db"))
+
+    started = time.perf_counter()
+    async with app.run_test(size=(120, 40)) as pilot:
+        ready = time.perf_counter() - started
+        await wait_until(pilot, lambda: first_frame)
+        first_paint = first_frame[0] - started
+        await wait_until(pilot, lambda: app.loading_complete)
+        list_shown = time.perf_counter() - started
+        await wait_until(pilot, lambda: not any(w.group == "load" and w.is_running for w in app.workers))
+        loaded = time.perf_counter() - started
+        result["startup"] = {
+            "ready_s": ready, "first_paint_s": first_paint, "list_shown_s": list_shown, "all_loaded_s": loaded,
+        }
+        await pilot.pause(0.3)
+
+        message_list = app.query_one("#message-list")
+        viewer = app.query_one("#message-viewer", MessageViewer)
+
+        # Filter: live while typing, then submitted with Enter, then cleared with / and Escape
+        await pilot.press("/")
+        for char in args.query[:-1]:
+            await pilot.press(char)
+        await pilot.pause(0.5)
+        before = message_list.messages
+        await pilot.press(args.query[-1])
+        live = await wait_until(pilot, lambda: message_list.messages is not before)
+        await pilot.pause(0.3)
+        start = time.perf_counter()
+        await pilot.press("enter")
+        await pilot.pause()
+        submit = time.perf_counter() - start
+        matches = len(message_list.messages)
+        # A submitted filter stays applied until the filter is reopened and cancelled
+        await pilot.press("/")
+        await pilot.pause(0.3)
+        start = time.perf_counter()
+        await pilot.press("escape")
+        clear = time.perf_counter() - start + await wait_until(pilot, lambda: len(message_list.messages) == count)
+        result["filter"] = {
+            "query": args.query, "matches": matches,
+            "live_s": live, "live_debounce_s": app.FILTER_DEBOUNCE, "submit_s": submit, "clear_s": clear,
+        }
+        await pilot.pause(0.3)
+
+        # Navigation: arrow-key steps through the pilot, each waiting until the app is
+        # idle again (this includes the pilot's own polling, so compare runs, not absolutes)
+        message_list.focus()
+        steps = min(args.steps, (count - 1) // 2)
+        step_times = []
+        start = time.perf_counter()
+        for _ in range(steps):
+            step_start = time.perf_counter()
+            await pilot.press("down")
+            step_times.append(time.perf_counter() - step_start)
+        total = time.perf_counter() - start
+        await pilot.pause(app.SELECTION_SETTLE_DELAY + 0.2)
+        
+        # Held arrow key: key events arrive at the keyboard repeat rate whether or not
+        # the app keeps up; lag is how late the event loop gets back to the next one
+        target = message_list.index + steps
+        interval = 1 / args.repeat_rate
+        lags = []
+        start = time.perf_counter()
+        for _ in range(steps):
+            step_start = time.perf_counter()
+            app.post_message(events.Key("down", None))
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - step_start - interval)
+        held = time.perf_counter() - start
+        settle = await wait_until(
+            pilot, lambda: message_list.index == target and viewer.content is app.messages[target]
+        )
+        result["navigation"] = {
+            "steps": steps,
+            "pilot_total_s": total,
+            "pilot_step_s": percentiles(step_times),
+            "held_key": {
+                "repeat_rate_hz": args.repeat_rate, "total_s": held, "lag_s": percentiles(lags), "settle_s": settle,
+            },
+        }
+
+        # Viewer: uncached rendering of messages spread over the whole list
+        messages = app.messages
+        sample = [messages[i * len(messages) // args.renders] for i in range(min(args.renders, len(messages)))]
+        render_times = []
+        for message in sample:
+            viewer._formatted_cache.clear()
+            start = time.perf_counter()
+            viewer.render_message(message)
+            render_times.append(time.perf_counter() - start)
+        result["viewer"] = {"render_s": percentiles(render_times)}
+
+    result["spans"] = {
+        name: {"count": n, "p50": p50, "p95": p95, "max": longest}
+        for name, (n, p50, p95, longest) in tracer.stats().items()
+    }
+    return result
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless benchmarks of the TUI on synthetic dumps')
+    parser.add_argument('--sizes', type=int, nargs='+', default=BENCH_SIZES,
+                        help='Numbers of messages to benchmark (default: 1000 10000 100000)')
+    parser.add_argument('--data-dir', default='bench_data',
+                        help='Directory for the generated dumps, reused across runs (default: bench_data)')
+    parser.add_argument('--output', '-o', default='bench_results.json',
+                        help='JSON file to write the results to (default: bench_results.json)')
+    parser.add_argument('--steps', type=int, default=100, help='Arrow-key steps to time (default: 100)')
+    parser.add_argument('--repeat-rate', type=float, default=30,
+                        help='Keyboard repeat rate for the held arrow key, per second (default: 30)')
+    parser.add_argument('--renders', type=int, default=200, help='Messages to render in the viewer (default: 200)')
+    parser.add_argument('--query', default=FILTER_QUERY, help=f'Filter to time (default: {FILTER_QUERY})')
+    parser.add_argument('--list-mode', choices=['virtual', 'widgets'], default='virtual',
+                        help='Message list implementation, see MESSAGE_LIST_MODE (default: virtual)')
+    args = parser.parse_args()
+
+    # Configure the app before importing it: no Gemini calls, no summary cache
+    # next to the real one, and tracing on from startup
+    os.environ["MESSAGE_LIST_MODE"] = args.list_mode
+    os.environ["GEMINI_API_KEY"] = ""
+    os.environ["SUMMARY_PREFETCH"] = "0"
+    os.environ["SUMMARY_CACHE_FILE"] = os.path.join(tempfile.mkdtemp(prefix="bench_app_"), "summaries.db")
+    os.environ["TRACE"] = "1"
+    import app as app_module
+    import textual
+
+    report = {
+        "started": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "textual": getattr(textual, "__version__", None),
+        "platform": platform.platform(),
+        "config": {
+            "steps": args.steps, "repeat_rate_hz": args.repeat_rate, "renders": args.renders,
+            "query": args.query, "list_mode": args.list_mode,
+        },
+        "results": [],
+    }
+    for count in args.sizes:
+        path = dump_path(args.data_dir, count)
+        print(f"Benchmarking {count} messages...")
+        result = asyncio.run(bench_size(app_module, path, count, args))
+        report["results"].append(result)
+        startup = result["startup"]
+        print(
+            f"  startup: ready {startup['ready_s'] * 1000:.0f} ms, "
+            f"first paint {startup['first_paint_s'] * 1000:.0f} ms, "
+            f"list {startup['list_shown_s'] * 1000:.0f} ms, all loaded {startup['all_loaded_s']:.2f} s"
+        )
+        print(
+            f"  filter '{args.query}' ({result['filter']['matches']} matches): "
+            f"live {result['filter']['live_s'] * 1000:.0f} ms, submit {result['filter']['submit_s'] * 1000:.0f} ms, "
+            f"clear {result['filter']['clear_s'] * 1000:.0f} ms"
+        )
+        navigation = result["navigation"]
+        step = navigation["pilot_step_s"]
+        lag = navigation["held_key"]["lag_s"]
+        print(
+            f"  {navigation['steps']} steps: pilot p50 {step['p50'] * 1000:.1f} ms, "
+            f"held key lag p50 {lag['p50'] * 1000:.1f} ms / p95 {lag['p95'] * 1000:.1f} ms, "
+            f"settled {navigation['held_key']['settle_s'] * 1000:.0f} ms after the last key"
+        )
+        render = result["viewer"]["render_s"]
+        print(f"  viewer render: p50 {render['p50'] * 1000:.2f} ms, p95 {render['p95'] * 1000:.2f} ms")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Synthetic Khoros data and run metadata shared by the benchmarks.
+
+Only uses the standard library, so the mock server and the fetch benchmark
+can import it without the TUI's dependencies.
+"""
+
+import datetime
+import json
+import os
+import random
+import subprocess
+
+TOPICS = [
+    "vault", "sync", "password", "passkey", "autofill", "browser", "extension", "login", "account",
+    "recovery", "watchtower", "android", "ios", "windows", "mac", "linux", "team", "admin", "share", "ssh",
+]
+WORDS = (
+    "the a to and of in is it for on that with this my when after since can not but have was we our "
+    "update version app desktop mobile phone device works again error message shows tried restart "
+    "reinstall support help issue problem setting option unable cannot fails working fine today "
+    "yesterday still anyone else same thing new old key item vault family business user users"
+).split()
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST_NAMES = ["Smith", "Chen", "Garcia", "Okafor", "Novak", "Tanaka", "Silva", "Müller", "Dubois", None]
+TITLES = ["Community Member", "Occasional Contributor", "Frequent Contributor", "Community Manager", None]
+
+
+def synthetic_sentence(rng: random.Random, topics: list) -> str:
+    words = [rng.choice(WORDS if rng.random() < 0.8 else topics) for _ in range(rng.randint(6, 22))]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + rng.choice([".", ".", ".", "?", "!"])
+
+
+def synthetic_body(rng: random.Random, message_id: int, topics: list) -> str:
+    """HTML body shaped like a typical community post"""
+    parts = []
+    for p in range(rng.randint(1, 6)):
+        text = " ".join(synthetic_sentence(rng, topics) for _ in range(rng.randint(1, 5)))
+        if rng.random() < 0.3:
+            href = f"https://community.example.com/t5/thread/m-p/{message_id}/{p}"
+            text += f" See <a href=\"{href}\">this thread</a>."
+        if rng.random() < 0.2:
+            text += (
+                " It&#39;s &quot;fine&quot; on mobile &amp; desktop &nbsp;&mdash; "
+                "<strong>not</strong> in the browser."
+            )
+        if rng.random() < 0.05:
+            text += " Thanks 🙏 — merci à tous."
+        parts.append(f"<p>{text}</p>")
+    if rng.random() < 0.3:
+        items = "".join(f"<li>{synthetic_sentence(rng, topics)}</li>" for _ in range(rng.randint(2, 5)))
+        parts.append(f"<ul>{items}</ul>")
+    if rng.random() < 0.15:
+        lines = "\n".join(
+            f"  {rng.choice(topics)}_{i} = load(&quot;{rng.choice(WORDS)}&quot;)" for i in range(rng.randint(2, 12))
+        )
+        parts.append(f"<pre><code>{lines}</code></pre>")
+    if rng.random() < 0.15:
+        parts.insert(0, f"<blockquote><p>{synthetic_sentence(rng, topics)}</p></blockquote>")
+    if rng.random() < 0.1:
+        src = f"https://community.example.com/image/{message_id}.png"
+        parts.append(f"<p><img src=\"{src}\" alt=\"screenshot\" /></p>")
+    return "\n".join(parts)
+
+
+def synthetic_node(rng: random.Random, message_id: int, post_time: datetime.datetime) -> dict:
+    """GraphQL message node with a random subject, author and body"""
+    topics = rng.sample(TOPICS, 3)
+    subject_words = [rng.choice(topics if rng.random() < 0.6 else WORDS) for _ in range(rng.randint(3, 9))]
+    return {
+        "id": str(message_id),
+        "subject": " ".join(subject_words).capitalize(),
+        "postTime": post_time.isoformat(timespec="milliseconds"),
+        "viewHref": f"https://community.example.com/t5/discussions/m-p/{message_id}",
+        "body": synthetic_body(rng, message_id, topics),
+        "author": {
+            "title": rng.choice(TITLES),
+            "lastName": rng.choice(LAST_NAMES),
+            "firstName": rng.choice(FIRST_NAMES),
+        },
+    }
+
+
+def write_dump(path: str, count: int, seed: int = 0) -> None:
+    """Write a dump of count synthetic messages, newest first, without holding them all in memory"""
+    rng = random.Random(seed)
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    post_time = now
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write('{"data": {"messages": {"edges": [\n')
+        for i in range(count):
+            post_time -= datetime.timedelta(seconds=rng.randint(10, 3600))
+            if i:
+                f.write(",\n")
+            f.write(json.dumps({"node": synthetic_node(rng, 200000 + i, post_time)}, ensure_ascii=False))
+        f.write("\n]}}}\n")
+    os.replace(tmp_path, path)
+
+
+def dump_path(data_dir: str, count: int) -> str:
+    """Path of the synthetic dump with count messages, generating it if needed"""
+    path = os.path.join(data_dir, f"synthetic_{count}.json")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"Generating {path}...")
+        write_dump(path, count)
+    return path
+
+
+
+def git_commit() -> str | None:
+    """Commit the benchmarks are run from, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
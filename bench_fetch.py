@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Throughput of the fetch path against the local mock Khoros server.
+
+Starts mock_khoros.MockKhoros in a background thread, points auth.py and
+fetch_posts.py at it and times:
+
+- single: one fetch_posts() query for --count messages (the mock serves at
+  most --max-page-size of them, like the real API's page limit)
+- paginated: fetch_posts_paginated() for --count messages at each --page-sizes,
+  streaming to a temporary JSONL file (and a temporary message store with --store)
+
+A paginated run that fails on an injected error or a 429 is resumed from its
+last saved cursor after --retry-delay seconds, the way a user would rerun it
+with --resume, so the messages per second include the cost of failures.
+Results are written as JSON (--output) so runs can be compared over time.
+
+Usage:
+    python bench_fetch.py
+    python bench_fetch.py --count 20000 --page-sizes 100 1000 --latency 0.08 --jitter 0.04
+    python bench_fetch.py --error-rate 0.05 --rate-limit 5 --output fetch_results.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+
+from bench_data import git_commit
+from mock_khoros import MockKhoros
+
+
+def run_fetch(fetch, args) -> tuple:
+    """
+    Run fetch() until it succeeds, resuming after each failure.
+
+    Returns:
+        (result of fetch, seconds, restarts)
+    """
+    restarts = 0
+    start = time.perf_counter()
+    while True:
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                result = fetch(restarts > 0)
+            break
+        except Exception as e:
+            restarts += 1
+            if restarts > args.max_restarts:
+                raise RuntimeError(f"Gave up after {args.max_restarts} restarts: {e}") from e
+            time.sleep(args.retry_delay)
+        finally:
+            if args.verbose:
+                print(output.getvalue(), end="")
+    return result, time.perf_counter() - start, restarts
+
+
+def served(mock: MockKhoros, before: dict) -> dict:
+    """What the mock served since the `before` snapshot of its stats"""
+    return {name: value - before[name] for name, value in mock.stats.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch throughput against a local mock Khoros server')
+    parser.add_argument('--count', '-c', type=int, default=10000, help='Messages to fetch per run (default: 10000)')
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[25, 100, 500],
+                        help='Page sizes of the paginated runs (default: 25 100 500)')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Server latency per request in seconds (default: 0.02)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Random extra latency per request, up to (default: 0)')
+    parser.add_argument('--max-page-size', type=int, default=1000,
+                        help='Largest page the server returns (default: 1000)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of requests answered with a 500, 0 to 1 (default: 0)')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='Requests per second before the server answers 429, 0 for none (default: 0)')
+    parser.add_argument('--burst', type=int, default=10,
+                        help='Requests allowed at once under --rate-limit (default: 10)')
+    parser.add_argument('--retry-delay', type=float, default=1.0,
+                        help='Seconds to wait before resuming a failed run (default: 1.0)')
+    parser.add_argument('--max-restarts', type=int, default=100, help='Failures allowed per run (default: 100)')
+    parser.add_argument('--store', action='store_true', help='Also write the messages into a temporary message store')
+    parser.add_argument('--output', '-o', default='bench_fetch_results.json',
+                        help='JSON file to write the results to (default: bench_fetch_results.json)')
+    parser.add_argument('--verbose', '-v', action='store_true', help="Show the fetch scripts' own output")
+    args = parser.parse_args()
+
+    mock = MockKhoros(messages=args.count, latency=args.latency, jitter=args.jitter,
+                      max_page_size=args.max_page_size, error_rate=args.error_rate,
+                      rate_limit=args.rate_limit, burst=args.burst).start()
+    work_dir = tempfile.mkdtemp(prefix="bench_fetch_")
+
+    # Configure auth before importing it: it reads its settings once, on import
+    os.environ.update({
+        "scheme": "http", "hostname": mock.hostname, "tapestry": mock.tapestry,
+        "username": "bench", "password": "bench",
+        "sessionKey": "", "sessionStartTime": "", "sessionLastUsed": "",
+        "sessionCacheFile": os.path.join(work_dir, "session.json"),
+    })
+    import fetch_posts
+    from message_store import MessageStore
+
+    report = {
+        "started": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "count": args.count, "latency_s": args.latency, "jitter_s": args.jitter,
+            "max_page_size": args.max_page_size, "error_rate": args.error_rate,
+            "rate_limit_per_s": args.rate_limit, "burst": args.burst, "store": args.store,
+        },
+        "results": [],
+    }
+
+    def record(name: str, page_size: int, messages: int, seconds: float, restarts: int, before: dict) -> None:
+        result = {
+            "run": name, "page_size": page_size, "messages": messages, "seconds": seconds,
+            "messages_per_s": messages / seconds if seconds else None, "restarts": restarts,
+            "served": served(mock, before),
+        }
+        report["results"].append(result)
+        server = result["served"]
+        print(
+            f"  {name:<9} page {page_size:>5}: {messages} messages in {seconds:.2f} s "
+            f"({result['messages_per_s']:.0f}/s), {server['requests']} requests, "
+            f"{server['throttled']} throttled, {server['errors']} errors, {server['logins']} logins, "
+            f"{restarts} restarts"
+        )
+
+    print(f"Mock community of {args.count} messages on http://{mock.hostname}")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetch_posts.get_auth_token()
+
+        def store_for(name: str):
+            return MessageStore(os.path.join(work_dir, f"{name}.db")) if args.store else None
+
+        before = dict(mock.stats)
+        store = store_for("single")
+        response, seconds, restarts = run_fetch(
+            lambda resumed: fetch_posts.fetch_posts(mock.hostname, args.count, store=store), args
+        )
+        edges = response.get('data', {}).get('messages', {}).get('edges', [])
+        record("single", min(args.count, args.max_page_size), len(edges), seconds, restarts, before)
+
+        for page_size in args.page_sizes:
+            jsonl_file = os.path.join(work_dir, f"paginated_{page_size}.jsonl")
+            before = dict(mock.stats)
+            store = store_for(f"paginated_{page_size}")
+            fetched, seconds, restarts = run_fetch(
+                lambda resumed: fetch_posts.fetch_posts_paginated(
+                    mock.hostname, args.count, page_size, jsonl_file, resume=resumed, store=store
+                ), args
+            )
+            record("paginated", page_size, fetched, seconds, restarts, before)
+    finally:
+        mock.stop()
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
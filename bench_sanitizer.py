@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the message body sanitizer against the original five-pass regex pipeline.
+
+Bodies are taken from a fetched dump (top_posters_output.json, or a JSONL file
+written by fetch_posts.py --paginate), converted with HTML2Text exactly like the
+viewer does, then cleaned by both implementations. The outputs must be identical.
+
+Usage:
+    python bench_sanitizer.py
+    python bench_sanitizer.py --file posts.jsonl --scale 20 --repeat 10
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from message_viewer import html_to_text, sanitize_body
+
+
+def legacy_sanitize(text: str) -> str:
+    """The chained re.sub passes MessageViewer used before sanitize_body"""
+    text = re.sub(r'&[a-zA-Z0-9#]+;', '', text)
+    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
+    text = re.sub(r'https?://[^\s]+', '[URL]', text)
+    text = re.sub(r'[^\w\s\.\,\!\?\-\:\;\(\)]', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def load_bodies(path: str) -> list:
+    """Read HTML bodies from a JSON dump or a JSONL file of message nodes"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line).get('body') or '' for line in f if line.strip()]
+        data = json.load(f)
+    return [edge['node'].get('body') or '' for edge in data['data']['messages']['edges']]
+
+
+def synthetic_bodies(count: int = 500) -> list:
+    """HTML bodies shaped like typical community posts, for when no dump is available"""
+    rng = random.Random(0)
+    words = "vault sync password passkey autofill browser extension login account error team admin".split()
+    bodies = []
+    for i in range(count):
+        paragraphs = []
+        for p in range(rng.randint(2, 12)):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(20, 120)))
+            paragraphs.append(
+                f"<p>{text} &amp; <a href=\"https://community.example.com/t5/{i}/{p}\">see thread</a> "
+                f"&lt;tag&gt; https://example.com/raw?id={i}&amp;p={p} <b>don't</b> &#x1F600; [sic]</p>"
+            )
+        paragraphs.append("<pre><code>def f(x):\n    return {x: [x * 2]}</code></pre>")
+        bodies.append("\n".join(paragraphs))
+    return bodies
+
+
+def time_it(func, texts: list, repeat: int) -> float:
+    """Best wall time over repeat runs of func across all texts"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the message body sanitizer')
+    parser.add_argument('--file', '-f', default='top_posters_output.json',
+                        help='JSON dump or JSONL file of messages (default: top_posters_output.json)')
+    parser.add_argument('--scale', type=int, default=10,
+                        help='Concatenate each body this many times to simulate large posts (default: 10)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of timed runs, best is reported (default: 5)')
+    args = parser.parse_args()
+
+    if os.path.exists(args.file):
+        bodies = load_bodies(args.file)
+        print(f"Loaded {len(bodies)} bodies from {args.file}")
+    else:
+        bodies = synthetic_bodies()
+        print(f"{args.file} not found, using {len(bodies)} synthetic bodies")
+
+    texts = [html_to_text(body) * max(args.scale, 1) for body in bodies if body]
+    if not texts:
+        print("No message bodies to benchmark")
+        sys.exit(1)
+    total_bytes = sum(len(text) for text in texts)
+    print(f"Corpus: {len(texts)} texts, {total_bytes / 1024 / 1024:.1f} MiB of HTML2Text output")
+
+    mismatches = [i for i, text in enumerate(texts) if sanitize_body(text) != legacy_sanitize(text)]
+    if mismatches:
+        print(f"Outputs differ for {len(mismatches)} bodies (first at index {mismatches[0]})")
+        sys.exit(1)
+    print("Outputs identical")
+
+    legacy_time = time_it(legacy_sanitize, texts, args.repeat)
+    new_time = time_it(sanitize_body, texts, args.repeat)
+    print(f"Five-pass pipeline: {legacy_time * 1000:.1f} ms ({total_bytes / legacy_time / 1024 / 1024:.1f} MiB/s)")
+    print(f"sanitize_body:      {new_time * 1000:.1f} ms ({total_bytes / new_time / 1024 / 1024:.1f} MiB/s)")
+    print(f"Speedup: {legacy_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
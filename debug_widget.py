@@ -6,6 +6,24 @@ class DebugWidget(Static):
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
         self.styles.display = "none"
+        self.info = ""
+        # Span name -> (count, p50, p95, max) from Tracer.stats(), shown under the info line
+        self.trace_stats = {}
     
     def update_debug_info(self, info: str) -> None:
-        self.update(f"[red]DEBUG:[/red] {info}") 
\ No newline at end of file
+        self.info = info
+        self._show()
+    
+    def update_trace_stats(self, stats: dict) -> None:
+        """Show span timings (see tracing.Tracer.stats) under the debug info"""
+        self.trace_stats = stats
+        self._show()
+    
+    def _show(self) -> None:
+        lines = [f"[red]DEBUG:[/red] {self.info}"]
+        for name, (count, p50, p95, longest) in self.trace_stats.items():
+            lines.append(
+                f"[bold]{name:<16}[/bold] n={count:<5} "
+                f"p50 {p50 * 1000:8.2f}ms  p95 {p95 * 1000:8.2f}ms  max {longest * 1000:8.2f}ms"
+            )
+        self.update("\n".join(lines))
@@ -1,25 +1,12 @@
-import requests
 import json
+import os
 import time
 from datetime import datetime
-from auth import get_auth_token, get_hostname
+from auth import get_auth_token, get_hostname, get_http_session, get_scheme, renew_auth_token
+from message_store import MessageStore
 
-def fetch_posts(community_url, message_count=100):
-    print(f"Starting fetch at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    # Get authentication token
-    auth_token = get_auth_token()
-    if not auth_token:
-        print("Error: No authentication token available")
-        return None
-    print("Authentication successful")
-
-    # GraphQL query
-    query = """
-    query($messageCount: Int!) {
-        messages(first: $messageCount) {
-            edges {
-            node {
+# Fields requested for every message node
+MESSAGE_FIELDS = """
                 id
                 subject
                 postTime
@@ -30,19 +17,41 @@ def fetch_posts(community_url, message_count=100):
                 lastName
                 firstName
                 }
-            }
-            }
-        }
-    }
+            """
+
+# Cursor-paginated variant of the messages query
+PAGED_QUERY = f"""
+    query($pageSize: Int!, $after: String) {{
+        messages(first: $pageSize, after: $after) {{
+            edges {{
+            node {{{MESSAGE_FIELDS}}}
+            }}
+            pageInfo {{
+                hasNextPage
+                endCursor
+            }}
+        }}
+    }}
     """
 
-    # Variables for the query
-    variables = {
-        "messageCount": message_count
-    }
+# Newest-first variant used by incremental sync, so it can stop at the high-water mark
+SYNC_QUERY = f"""
+    query($pageSize: Int!, $after: String) {{
+        messages(first: $pageSize, after: $after, sorts: {{ postTime: {{ direction: DESC }} }}) {{
+            edges {{
+            node {{{MESSAGE_FIELDS}}}
+            }}
+            pageInfo {{
+                hasNextPage
+                endCursor
+            }}
+        }}
+    }}
+    """
 
-    # Headers including auth token with cache-busting
-    headers = {
+def build_headers(auth_token):
+    """Headers including auth token with cache-busting"""
+    return {
         "Content-Type": "application/json",
         "li-api-session-key": auth_token,
         "Cache-Control": "no-cache, no-store, must-revalidate",
@@ -50,8 +59,65 @@ def fetch_posts(community_url, message_count=100):
         "Expires": "0"
     }
 
+def post_graphql(url, headers, request_payload):
+    """
+    POST a GraphQL request, logging in again once if the session key is rejected.
+
+    A cached session key can be invalidated on the server (logout, restart) while
+    still inside its time window. On a 401 the cache is cleared, a new key is
+    obtained and the request is retried; headers is updated in place so later
+    requests with the same headers use the new key.
+    """
+    response = get_http_session().post(url, json=request_payload, headers=headers, timeout=30)
+    if response.status_code == 401:
+        print("Session key rejected, logging in again")
+        headers["li-api-session-key"] = renew_auth_token()
+        response = get_http_session().post(url, json=request_payload, headers=headers, timeout=30)
+    return response
+
+def graphql_url(community_url):
+    """GraphQL endpoint for the community"""
+    return f"{get_scheme()}://{community_url}/t5/s/api/2.1/graphql"
+
+def fetch_posts(community_url, message_count=100, store=None, output_file=None):
+    """
+    Fetch message_count messages in a single query.
+
+    With output_file the raw GraphQL response is written there; otherwise a
+    summary of each message is printed. If a MessageStore is given, the
+    messages are written into it as well.
+
+    Returns the parsed response.
+    """
+    print(f"Starting fetch at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    # Get authentication token
+    auth_token = get_auth_token()
+    if not auth_token:
+        print("Error: No authentication token available")
+        return None
+    print("Authentication successful")
+
+    # GraphQL query
+    query = f"""
+    query($messageCount: Int!) {{
+        messages(first: $messageCount) {{
+            edges {{
+            node {{{MESSAGE_FIELDS}}}
+            }}
+        }}
+    }}
+    """
+
+    # Variables for the query
+    variables = {
+        "messageCount": message_count
+    }
+
+    headers = build_headers(auth_token)
+
     # Make the request
-    url = f"https://{community_url}/t5/s/api/2.1/graphql"
+    url = graphql_url(community_url)
     print(f"Fetching messages from: {community_url}")
     
     request_payload = {
@@ -59,12 +125,7 @@ def fetch_posts(community_url, message_count=100):
         "variables": variables
     }
     
-    response = requests.post(
-        url,
-        json=request_payload,
-        headers=headers,
-        timeout=30
-    )
+    response = post_graphql(url, headers, request_payload)
 
     print(f"Response status: {response.status_code}")
 
@@ -72,10 +133,15 @@ def fetch_posts(community_url, message_count=100):
     if response.status_code == 200:
         response_dict = response.json()  # Safely parse JSON response
 
-        if args.write_output:
-            with open(args.output_file, 'w') as f:
+        if store is not None:
+            edges = response_dict.get('data', {}).get('messages', {}).get('edges', [])
+            store.upsert_messages(edge.get('node', {}) for edge in edges)
+            print(f"Stored {len(edges)} messages in {store.db_path}")
+
+        if output_file:
+            with open(output_file, 'w') as f:
                 json.dump(response_dict, f, indent=4)
-            print(f"Output written to {args.output_file}")
+            print(f"Output written to {output_file}")
             return response_dict
 
         # Extract the messages data
@@ -101,11 +167,238 @@ def fetch_posts(community_url, message_count=100):
         print(f"Request failed: {response.text}")
         raise Exception(f"Query failed with status code {response.status_code}: {response.text}")
 
+def fetch_page(url, headers, query, page_size, after=None):
+    """Fetch one page of a cursor-paginated messages query, returning (edges, pageInfo)"""
+    request_payload = {
+        "query": query,
+        "variables": {
+            "pageSize": page_size,
+            "after": after
+        }
+    }
+
+    response = post_graphql(url, headers, request_payload)
+    if response.status_code != 200:
+        print(f"Request failed: {response.text}")
+        raise Exception(f"Query failed with status code {response.status_code}: {response.text}")
+
+    messages = response.json().get('data', {}).get('messages', {})
+    return messages.get('edges', []), messages.get('pageInfo', {})
+
+def load_fetch_state(state_file):
+    """Load the saved pagination state, or None if there is nothing to resume"""
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file, 'r') as f:
+        return json.load(f)
+
+def save_fetch_state(state_file, state):
+    """Atomically write the pagination state so a crash never leaves it half-written"""
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f, indent=4)
+    os.replace(tmp_file, state_file)
+
+def fetch_posts_paginated(community_url, message_count=100, page_size=100,
+                          jsonl_file="top_posters_output.jsonl", resume=False, store=None):
+    """
+    Fetch messages page by page following pageInfo.endCursor.
+
+    Each page is appended to jsonl_file (one message node per line) as soon as it
+    arrives, so memory stays flat regardless of message_count. After every page the
+    cursor is saved to "<jsonl_file>.state"; with resume=True an interrupted run picks
+    up from the last saved cursor. If a MessageStore is given, each page is also
+    written into it.
+
+    Returns the number of messages written to jsonl_file.
+    """
+    print(f"Starting paginated fetch at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    state_file = f"{jsonl_file}.state"
+    state = load_fetch_state(state_file) if resume else None
+    if state and not os.path.exists(jsonl_file):
+        print(f"{jsonl_file} is missing, starting over")
+        state = None
+    if state:
+        if state.get("done"):
+            print(f"Nothing to resume: {jsonl_file} is already complete ({state['fetched']} messages)")
+            return state["fetched"]
+        print(f"Resuming after cursor {state['endCursor']} ({state['fetched']} messages already saved)")
+    else:
+        state = {"endCursor": None, "fetched": 0, "bytes": 0, "done": False}
+
+    auth_token = get_auth_token()
+    if not auth_token:
+        print("Error: No authentication token available")
+        return None
+    print("Authentication successful")
+
+    url = graphql_url(community_url)
+    headers = build_headers(auth_token)
+    print(f"Fetching messages from: {community_url}")
+
+    mode = 'r+' if state["bytes"] else 'w'
+    with open(jsonl_file, mode) as f:
+        # Drop anything written after the last saved cursor (e.g. a page that was
+        # interrupted mid-write) so resumed runs never duplicate messages
+        f.seek(state["bytes"])
+        f.truncate()
+
+        while state["fetched"] < message_count:
+            edges, page_info = fetch_page(url, headers, PAGED_QUERY,
+                                          min(page_size, message_count - state["fetched"]),
+                                          state["endCursor"])
+
+            for edge in edges:
+                f.write(json.dumps(edge.get('node', {})))
+                f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+            if store is not None:
+                store.upsert_messages(edge.get('node', {}) for edge in edges)
+
+            state["fetched"] += len(edges)
+            state["endCursor"] = page_info.get('endCursor')
+            state["bytes"] = f.tell()
+            state["done"] = not page_info.get('hasNextPage') or not edges
+            save_fetch_state(state_file, state)
+            print(f"Fetched page of {len(edges)} messages ({state['fetched']} total)")
+
+            if state["done"]:
+                break
+
+    print(f"Output written to {jsonl_file}")
+    return state["fetched"]
+
+def parse_post_time(post_time):
+    """Parse a Khoros postTime (ISO 8601, possibly with a 'Z' suffix) into an aware datetime"""
+    return datetime.fromisoformat(post_time.replace('Z', '+00:00'))
+
+def newest_message(edges):
+    """Return the high-water mark {"postTime", "id"} of a list of edges, or None if empty"""
+    newest = None
+    for edge in edges:
+        node = edge.get('node', {})
+        if not node.get('postTime'):
+            continue
+        if newest is None or parse_post_time(node['postTime']) > parse_post_time(newest['postTime']):
+            newest = {"postTime": node['postTime'], "id": node.get('id')}
+    return newest
+
+def sync_posts(community_url, output_file="top_posters_output.json", page_size=25, max_messages=100,
+               store=None):
+    """
+    Incrementally sync output_file with the community.
+
+    Messages are requested newest first and fetching stops at the newest postTime/id
+    already stored (recorded in "<output_file>.sync"), so a refresh only downloads
+    what is new. New messages are merged into the stored GraphQL dump, deduplicated
+    by id. If a MessageStore is given, the new messages are upserted into it as well.
+
+    max_messages is the budget of a single run. When more than that many messages
+    are new, the run stops early, keeps the old high-water mark and records the
+    cursor it stopped at; the next sync continues from there until it catches up,
+    and only then moves the high-water mark forward. Without a high-water mark
+    (output_file does not exist yet) max_messages is the size of the initial fetch.
+
+    Returns the number of new messages merged into output_file.
+    """
+    print(f"Starting incremental sync at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    stored = {"data": {"messages": {"edges": []}}}
+    if os.path.exists(output_file):
+        with open(output_file, 'r') as f:
+            stored = json.load(f)
+    stored_edges = stored.get('data', {}).get('messages', {}).get('edges', [])
+
+    state_file = f"{output_file}.sync"
+    high_water = load_fetch_state(state_file) or newest_message(stored_edges)
+    if high_water is None and store is not None:
+        high_water = store.high_water_mark()
+    # Set when an earlier sync ran out of budget before catching up:
+    # {"after": cursor to continue from, "newest": high-water mark once caught up}
+    resume = high_water.pop('resume', None) if high_water else None
+    if high_water:
+        print(f"High-water mark: {high_water['postTime']} (id {high_water['id']})")
+        high_water_time = parse_post_time(high_water['postTime'])
+    else:
+        print("No stored messages, fetching from scratch")
+    if resume:
+        print(f"Continuing an unfinished sync after cursor {resume['after']}")
+
+    auth_token = get_auth_token()
+    if not auth_token:
+        print("Error: No authentication token available")
+        return None
+    print("Authentication successful")
+
+    url = graphql_url(community_url)
+    headers = build_headers(auth_token)
+    print(f"Fetching new messages from: {community_url}")
+
+    new_edges = []
+    after = resume['after'] if resume else None
+    caught_up = False
+    has_next_page = True
+    while not caught_up and len(new_edges) < max_messages:
+        edges, page_info = fetch_page(url, headers, SYNC_QUERY,
+                                      min(page_size, max_messages - len(new_edges)), after)
+        for edge in edges:
+            node = edge.get('node', {})
+            if high_water:
+                post_time = parse_post_time(node['postTime'])
+                if post_time < high_water_time or (
+                        post_time == high_water_time and node.get('id') == high_water['id']):
+                    caught_up = True
+                    break
+            new_edges.append(edge)
+
+        after = page_info.get('endCursor')
+        if not page_info.get('hasNextPage') or not edges:
+            has_next_page = False
+            break
+
+    print(f"Found {len(new_edges)} new messages")
+
+    # Work out the next state before touching any file
+    newest = resume['newest'] if resume else newest_message(new_edges)
+    if high_water and not caught_up and has_next_page:
+        # Out of budget: messages between here and the high-water mark are still missing
+        print(f"Stopped after {max_messages} messages before reaching the high-water mark; "
+              f"run --sync again to fetch the rest")
+        next_state = {**high_water, "resume": {"after": after, "newest": newest or high_water}}
+    else:
+        next_state = None
+
+    if not new_edges:
+        if next_state is None and resume:
+            save_fetch_state(state_file, newest_message([{"node": newest}] + stored_edges))
+        return 0
+
+    # Merge newest first, letting freshly fetched copies replace stored ones with the same id
+    new_ids = {edge['node']['id'] for edge in new_edges}
+    merged = new_edges + [edge for edge in stored_edges if edge.get('node', {}).get('id') not in new_ids]
+    if resume:
+        # A continued sync fetches messages older than the ones the previous run stored
+        merged.sort(key=lambda edge: parse_post_time(edge['node']['postTime']), reverse=True)
+    stored.setdefault('data', {}).setdefault('messages', {})['edges'] = merged
+
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(stored, f, indent=4)
+    os.replace(tmp_file, output_file)
+    if next_state is None:
+        next_state = newest_message(merged + ([{"node": newest}] if resume else []))
+    save_fetch_state(state_file, next_state)
+    if store is not None:
+        store.upsert_messages(edge['node'] for edge in new_edges)
+    print(f"Merged into {output_file} ({len(merged)} messages stored)")
+    return len(new_ids)
+
 # Example usage:
 if __name__ == "__main__":
-    # Get hostname and auth token from auth module
+    # Get hostname from auth module; the fetch functions get the auth token themselves
     hostname = get_hostname()
-    auth_token = get_auth_token()
 
     # Add command line argument parsing
     import argparse
@@ -117,10 +410,34 @@ if __name__ == "__main__":
                        help='Output file path (default: top_posters_output.json)')
     parser.add_argument('--count', '-c', type=int, default=100,
                        help='Number of messages to fetch (default: 100)')
+    parser.add_argument('--paginate', '-p', action='store_true',
+                       help='Follow cursors page by page, streaming each page to --jsonl-file')
+    parser.add_argument('--page-size', type=int, default=100,
+                       help='Messages per page in paginated and sync mode (default: 100)')
+    parser.add_argument('--jsonl-file', default='top_posters_output.jsonl',
+                       help='JSONL output path for paginated mode (default: top_posters_output.jsonl)')
+    parser.add_argument('--resume', '-r', action='store_true',
+                       help='Resume an interrupted paginated fetch from its last saved cursor')
+    parser.add_argument('--sync', '-s', action='store_true',
+                       help='Only fetch messages newer than those in --output-file and merge them in')
+    parser.add_argument('--db', default='messages.db',
+                       help='SQLite message store to write into (default: messages.db)')
+    parser.add_argument('--no-db', action='store_true',
+                       help='Do not write fetched messages into the SQLite store')
     args = parser.parse_args()
+
+    store = None if args.no_db else MessageStore(args.db)
     
     try:
-        result = fetch_posts(hostname, args.count)
+        if args.sync:
+            result = sync_posts(hostname, args.output_file, args.page_size, max_messages=args.count,
+                                store=store)
+        elif args.paginate or args.resume:
+            result = fetch_posts_paginated(hostname, args.count, args.page_size,
+                                           args.jsonl_file, resume=args.resume, store=store)
+        else:
+            result = fetch_posts(hostname, args.count, store=store,
+                                 output_file=args.output_file if args.write_output else None)
         print(f"Successfully fetched {args.count} messages")
     except Exception as e:
         print("Error fetching data:")
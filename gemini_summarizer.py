@@ -1,16 +1,52 @@
 import os
+import time
+from collections import deque
 import google.generativeai as genai
 from dotenv import load_dotenv
 from textual import log
+from summary_cache import SummaryCache
+from prompt_builder import build_summary_prompt
+from summarizer_backend import SummarizerBackend, SummaryError
+from tracing import tracer
 
 # Load environment variables
 load_dotenv()
 
-class GeminiSummarizer:
+class GeminiSummarizer(SummarizerBackend):
     """A class to handle message summarization using Google's Gemini API"""
     
-    def __init__(self):
-        """Initialize the Gemini API client"""
+    name = "Gemini API"
+    
+    MODEL_NAME = "gemini-1.5-flash"
+    
+    # Bump whenever the prompt changes so cached summaries from the old prompt are not reused
+    PROMPT_VERSION = "2"
+    
+    # Number of recent requests kept in request_stats
+    REQUEST_STATS_SIZE = 100
+    
+    def __init__(self, cache: SummaryCache = None):
+        """
+        Initialize the Gemini API client
+        
+        Args:
+            cache: Summary cache to use; by default one is opened at SUMMARY_CACHE_FILE
+                   (summaries.db), limited to SUMMARY_CACHE_MAX_MB megabytes (16)
+        """
+        # Token budget for the message content in a prompt; longer posts are trimmed (0 disables)
+        self.prompt_tokens = int(os.getenv("SUMMARY_PROMPT_TOKENS", "2000"))
+        # Input size and latency of recent API requests, oldest first
+        self.request_stats = deque(maxlen=self.REQUEST_STATS_SIZE)
+        
+        if cache is None:
+            try:
+                cache = SummaryCache(
+                    os.getenv("SUMMARY_CACHE_FILE", "summaries.db"),
+                    max_bytes=int(float(os.getenv("SUMMARY_CACHE_MAX_MB", "16")) * 1024 * 1024),
+                )
+            except Exception as e:
+                log.error(f"Failed to open summary cache: {e}")
+        self.cache = cache
 
         self.api_key = os.getenv("GEMINI_API_KEY")
         if not self.api_key:
@@ -20,7 +56,7 @@ class GeminiSummarizer:
             
         try:
             genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            self.model = genai.GenerativeModel(self.MODEL_NAME)
             log.info("Gemini API client initialized successfully")
         except Exception as e:
             log.error(f"Failed to initialize Gemini API: {e}")
@@ -30,53 +66,142 @@ class GeminiSummarizer:
         """Check if the Gemini API is available"""
         return self.api_key is not None and self.model is not None
     
-    async def summarize_message(self, message_data: dict) -> str:
+    def cached_summary(self, message_data: dict):
+        """Summary of this exact message from the cache, or None"""
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(
+                message_data["id"], message_data.get("body") or "", self.MODEL_NAME, self.PROMPT_VERSION
+            )
+        except Exception as e:
+            log.error(f"Error reading summary cache: {e}")
+            return None
+    
+    def store_summary(self, message_data: dict, summary: str) -> None:
+        """Remember a generated summary for this exact message"""
+        if self.cache is None:
+            return
+        try:
+            self.cache.put(
+                message_data["id"], message_data.get("body") or "", self.MODEL_NAME, self.PROMPT_VERSION, summary
+            )
+        except Exception as e:
+            log.error(f"Error writing summary cache: {e}")
+    
+    def build_prompt(self, message_data: dict) -> tuple:
+        """
+        Build the summarization prompt for a message
+        
+        The HTML body is converted to plain text and trimmed to the
+        SUMMARY_PROMPT_TOKENS budget (see prompt_builder).
+        
+        Returns:
+            (prompt, stats) describing the size of the input
+        """
+        return build_summary_prompt(message_data, self.prompt_tokens)
+    
+    async def summarize_message(self, message_data: dict, on_chunk=None) -> str:
         """
         Summarize a message using Gemini API
         
+        Summaries are served from the persistent cache when the same message
+        (same id and body) was summarized before with the same model and prompt.
+        
         Args:
             message_data: Dictionary containing message information
+            on_chunk: Optional callback; when given the response is streamed and
+                      on_chunk(text_so_far) is called as each chunk arrives
             
         Returns:
-            Summary string or error message
+            Summary string
+            
+        Raises:
+            SummaryError: With a message for the user if the API is not available or the request failed
         """
+        cached = self.cached_summary(message_data)
+        if cached is not None:
+            log.info(f"Summary cache hit for message {message_data.get('id')}")
+            return cached
+        
         if not self.is_available():
-            return "Gemini API not available. Please set GEMINI_API_KEY environment variable."
+            raise SummaryError("Gemini API not available. Please set GEMINI_API_KEY environment variable.")
         
         try:
-            # Extract relevant message content
-            subject = message_data.get('subject', 'No subject')
-            body = message_data.get('body', 'No content')
-            author_info = message_data.get('author', {})
-            author_name = f"{author_info.get('firstName', '')} {author_info.get('lastName', '')}".strip() or "Unknown author"
-            
-            # Create prompt for summarization
-            prompt = f"""
-            Please provide a concise summary of the following message from a community forum:
-            
-            Subject: {subject}
-            Author: {author_name}
-            Content: {body}
-            
-            Please summarize the key points in 2-3 sentences, focusing on:
-            - The main topic or question
-            - Any specific requests or issues mentioned
-            - The overall tone and context
-            
-            Keep the summary clear and professional.
-            """
-            
-            # Generate summary
-            response = await self.model.generate_content_async(prompt)
-            
-            if response and response.text:
-                return response.text.strip()
-            else:
-                return "Failed to generate summary. Please try again."
-                
+            prompt, stats = self.build_prompt(message_data)
+            summary = await self.generate(prompt, stats, on_chunk=on_chunk)
         except Exception as e:
             log.error(f"Error generating summary: {e}")
-            return f"Error generating summary: {str(e)}"
+            raise SummaryError(f"Error generating summary: {str(e)}") from e
+        
+        if not summary:
+            raise SummaryError("Failed to generate summary. Please try again.")
+        self.store_summary(message_data, summary)
+        return summary
+    
+    async def generate(self, prompt: str, stats: dict, on_chunk=None) -> str:
+        """
+        Send a prompt to Gemini and return the response text.
+        
+        Unlike summarize_message this does not use the cache and raises on errors.
+        
+        Args:
+            prompt: Complete prompt
+            stats: Input size of the prompt, recorded in request_stats (see prompt_builder)
+            on_chunk: Optional callback; when given the response is streamed and
+                      on_chunk(text_so_far) is called as each chunk arrives
+            
+        Returns:
+            Response text, stripped (empty if the model returned none)
+        """
+        if not self.is_available():
+            raise RuntimeError("Gemini API not available")
+        
+        started = time.monotonic()
+        if on_chunk is None:
+            response = await self.model.generate_content_async(prompt)
+            text = response.text if response else ""
+        else:
+            response = await self.model.generate_content_async(prompt, stream=True)
+            parts = []
+            async for chunk in response:
+                try:
+                    chunk_text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. only safety metadata)
+                    continue
+                if chunk_text:
+                    parts.append(chunk_text)
+                    on_chunk("".join(parts))
+            text = "".join(parts)
+        
+        elapsed = time.monotonic() - started
+        tracer.record("summarize", elapsed)
+        self.record_request(stats, response, elapsed)
+        return text.strip()
+    
+    def record_request(self, stats: dict, response, elapsed: float) -> None:
+        """
+        Add a finished API request to request_stats and log its input size.
+        
+        Args:
+            stats: Input size from build_prompt
+            response: API response, for the token count reported by the model
+            elapsed: Seconds the request took
+        """
+        stats = dict(stats, seconds=round(elapsed, 3), prompt_tokens=None)
+        try:
+            stats["prompt_tokens"] = response.usage_metadata.prompt_token_count
+        except Exception:
+            pass
+        self.request_stats.append(stats)
+        request = stats.get("request") or f"message {stats['message_id']}"
+        log.info(
+            f"Summary request for {request}: {stats['body_chars']} chars of HTML, "
+            f"{stats['prompt_chars']} chars of prompt (~{stats['estimated_tokens']} tokens, "
+            f"{stats['prompt_tokens'] or '?'} counted){' trimmed' if stats['trimmed'] else ''}, "
+            f"{elapsed:.2f}s"
+        )
     
     def get_status_message(self) -> str:
         """Get a status message about the Gemini API availability"""
@@ -18,6 +18,7 @@ class KeyboardCommands(Static):
             "[yellow]↑/↓[/yellow] - Navigate message list",
             "[yellow]Enter[/yellow] - Open message in browser",
             "[yellow]s[/yellow] - Summarize message with AI",
+            "[yellow]g[/yellow] - AI digest of all listed messages",
             "[yellow]d[/yellow] - Toggle debug window",
             "[yellow]t[/yellow] - Test Gemini connection",
             # "[yellow]Tab[/yellow] - Switch between panels"
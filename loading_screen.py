@@ -7,18 +7,8 @@ class LoadingScreen(Static):
     def __init__(self, **kwargs) -> None:
         super().__init__("⠋ Loading Khoros TUI Reader...", **kwargs)
         self.styles.display = "block"
-        self.loading_frames = [
-            "⠋ Loading Khoros TUI Reader...",
-            "⠙ Loading Khoros TUI Reader...",
-            "⠹ Loading Khoros TUI Reader...",
-            "⠸ Loading Khoros TUI Reader...",
-            "⠼ Loading Khoros TUI Reader...",
-            "⠴ Loading Khoros TUI Reader...",
-            "⠦ Loading Khoros TUI Reader...",
-            "⠧ Loading Khoros TUI Reader...",
-            "⠇ Loading Khoros TUI Reader...",
-            "⠏ Loading Khoros TUI Reader..."
-        ]
+        self.loading_text = "Loading Khoros TUI Reader..."
+        self.loading_frames = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
         self.current_frame = 0
         self.animation_timer: Timer | None = None
         self.is_loading = True
@@ -31,7 +21,13 @@ class LoadingScreen(Static):
         """Animate the loading spinner only when loading"""
         if self.is_loading:
             self.current_frame = (self.current_frame + 1) % len(self.loading_frames)
-            self.update(self.loading_frames[self.current_frame])
+            self.update(f"{self.loading_frames[self.current_frame]} {self.loading_text}")
+    
+    def set_progress(self, text: str) -> None:
+        """Replace the text shown next to the spinner, e.g. with loading progress"""
+        self.loading_text = text
+        if self.is_loading:
+            self.update(f"{self.loading_frames[self.current_frame]} {text}")
     
     def set_loading_state(self, loading: bool) -> None:
         """Set the loading state and update display accordingly"""
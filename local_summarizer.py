@@ -0,0 +1,108 @@
+import math
+import re
+from collections import Counter
+
+from prompt_builder import message_text, split_code
+from summarizer_backend import SummarizerBackend, SummaryError
+
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9'_-]*")
+_LIST_MARKER_RE = re.compile(r'^\s*(?:[*+-]|\d+\.)\s+')
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further get got had has have having
+he her here hers him his how i if in into is it its just let me more most my no nor not now of off on once
+only or other our ours out over own same she should so some such than that the their theirs them then there
+these they this those through to too under until up very was we were what when where which while who whom
+why will with would you your yours also hi hello thanks thank please regards any anyone one us im ive dont
+""".split())
+
+
+def _words(text: str) -> list:
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+class LocalSummarizer(SummarizerBackend):
+    """
+    Extractive summarizer that runs locally, in milliseconds and without a network.
+
+    Picks the sentences of the body that carry the most weight by TF-IDF, with
+    sentences as documents: words used often in the post, but not in every
+    sentence, score highest, and words from the subject count double. The
+    chosen sentences are returned in their original order.
+    """
+
+    name = "Local summary"
+
+    # Most sentences in a summary, and most characters
+    MAX_SENTENCES = 3
+    MAX_CHARS = 600
+
+    # Sentences with fewer words (after dropping stopwords) are only used if nothing else is left
+    MIN_WORDS = 3
+
+    def is_available(self) -> bool:
+        return True
+
+    def sentences(self, body: str) -> list:
+        """Sentences of the prose in an HTML body, leaving out code and quoted replies"""
+        prose, _ = split_code(message_text(body))
+        lines = [_LIST_MARKER_RE.sub('', line) for line in prose.split('\n') if not line.lstrip().startswith('>')]
+        return [sentence.strip() for sentence in _SENTENCE_RE.split('\n'.join(lines)) if sentence.strip()]
+
+    def summarize(self, message_data: dict) -> str:
+        """
+        Extractive summary of a message.
+
+        Args:
+            message_data: Message dict or MessageRecord
+
+        Returns:
+            The most informative sentences of the body, or "" if it has no text
+        """
+        sentences = self.sentences(message_data.get('body') or '')
+        if not sentences:
+            return ""
+        words = [_words(sentence) for sentence in sentences]
+        candidates = [i for i, sentence_words in enumerate(words) if len(sentence_words) >= self.MIN_WORDS]
+        if not candidates:
+            candidates = [i for i, sentence_words in enumerate(words) if sentence_words] or [0]
+
+        term_counts = Counter(word for sentence_words in words for word in sentence_words)
+        sentence_counts = Counter(word for sentence_words in words for word in set(sentence_words))
+        subject_words = set(_words(message_data.get('subject') or ''))
+        weights = {
+            word: count * math.log(1 + len(sentences) / sentence_counts[word]) * (2 if word in subject_words else 1)
+            for word, count in term_counts.items()
+        }
+
+        def score(i: int) -> float:
+            unique = set(words[i])
+            # Normalized by length so long sentences don't win just by being long;
+            # the opening sentence usually states the question, so it gets a small boost
+            value = sum(weights[word] for word in unique) / math.sqrt(len(unique) + 1)
+            return value * (1.2 if i == 0 else 1)
+
+        ranked = sorted(candidates, key=score, reverse=True)
+        chosen = []
+        length = 0
+        for i in ranked:
+            if len(chosen) == self.MAX_SENTENCES:
+                break
+            if chosen and length + len(sentences[i]) > self.MAX_CHARS:
+                continue
+            chosen.append(i)
+            length += len(sentences[i]) + 1
+
+        summary = ' '.join(sentences[i] for i in sorted(chosen))
+        if len(summary) > self.MAX_CHARS:
+            summary = summary[:self.MAX_CHARS].rsplit(' ', 1)[0] + '...'
+        return summary
+
+    async def summarize_message(self, message_data: dict, on_chunk=None) -> str:
+        summary = self.summarize(message_data)
+        if not summary:
+            raise SummaryError("Message has no text to summarize")
+        return summary
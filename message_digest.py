@@ -0,0 +1,254 @@
+import asyncio
+
+from textual import log
+
+from prompt_builder import author_name, estimate_tokens, message_text, trim_to_budget
+
+
+# Asks for notes on one chunk of posts; the notes of all chunks are combined by DIGEST_PROMPT
+MAP_PROMPT = """Below are {count} posts from a community forum.
+
+List the main topics, questions and issues they raise, one line each, with the
+number of posts that mention it. Note any problem reported by several people.
+Be brief: these notes will be combined with notes on other posts.
+
+{material}"""
+
+DIGEST_PROMPT = """Below are {source} covering {count} posts from a community forum.
+
+Write a digest of these posts for a community manager:
+- Start with a two or three sentence overview
+- Then list the main topics, questions and issues, most common first, with roughly how many posts mention each
+- End with anything that looks urgent or needs a reply
+
+Keep the digest clear and professional.
+
+{material}"""
+
+# Separates posts, or notes, within one prompt
+SEPARATOR = "\n\n---\n\n"
+
+
+def format_post(message, max_tokens: int) -> str:
+    """
+    One post as it appears in a digest prompt: a header line and the plain text body.
+
+    Args:
+        message: Message dict or MessageRecord
+        max_tokens: Token budget for the body; longer bodies are trimmed like single-message prompts
+
+    Returns:
+        Formatted post
+    """
+    text, _ = trim_to_budget(message_text(message.get('body') or ''), max_tokens)
+    author = author_name(message.get('author'))
+    return f"Subject: {message.get('subject') or 'No subject'} (by {author}, {message.get('postTime', '')})\n{text}"
+
+
+def pack(items: list, max_tokens: int) -> list:
+    """
+    Group consecutive text items so that each group fits max_tokens once joined.
+
+    An item larger than max_tokens on its own gets a group of its own.
+
+    Returns:
+        List of lists of items
+    """
+    groups = []
+    group = []
+    group_tokens = 0
+    separator_tokens = estimate_tokens(SEPARATOR)
+    for item in items:
+        tokens = estimate_tokens(item) + separator_tokens
+        if group and group_tokens + tokens > max_tokens:
+            groups.append(group)
+            group = []
+            group_tokens = 0
+        group.append(item)
+        group_tokens += tokens
+    if group:
+        groups.append(group)
+    return groups
+
+
+class DigestBuilder:
+    """
+    Map-reduce digest of many messages.
+
+    The posts are split into chunks that fit chunk_tokens, each chunk is
+    summarized into notes (at most `concurrency` API calls at a time), and the
+    notes are combined into one digest. When the notes themselves do not fit
+    one prompt they are combined in rounds. Results are kept in the
+    summarizer's cache, so building the digest of the same posts again only
+    calls the API for what changed.
+    """
+
+    # Bump whenever MAP_PROMPT or DIGEST_PROMPT changes
+    PROMPT_VERSION = "1"
+
+    def __init__(self, summarizer, limiter=None, concurrency: int = 2, chunk_tokens: int = 8000,
+                 message_tokens: int = 300) -> None:
+        """
+        Args:
+            summarizer: GeminiSummarizer used for the API calls and its cache
+            limiter: Optional rate limiter with an async acquire(), e.g. the summary scheduler's token bucket
+            concurrency: Maximum number of chunks summarized at the same time
+            chunk_tokens: Token budget of the material in one prompt
+            message_tokens: Token budget of one post within a chunk
+        """
+        self.summarizer = summarizer
+        self.limiter = limiter
+        self.concurrency = max(1, concurrency)
+        self.chunk_tokens = chunk_tokens
+        self.message_tokens = message_tokens
+
+    def chunk_messages(self, messages: list) -> list:
+        """
+        Split messages into prompt-sized chunks.
+
+        Reads and converts every body, so call it from a worker thread for large sets.
+
+        Returns:
+            List of (material, post count, HTML chars) tuples
+        """
+        posts = [format_post(message, self.message_tokens) for message in messages]
+        chunks = []
+        start = 0
+        for group in pack(posts, self.chunk_tokens):
+            end = start + len(group)
+            body_chars = sum(len(message.get('body') or '') for message in messages[start:end])
+            chunks.append((SEPARATOR.join(group), len(group), body_chars))
+            start = end
+        return chunks
+
+    async def build(self, messages: list, on_progress=None, on_chunk=None) -> str:
+        """
+        Build the digest of messages.
+
+        Args:
+            messages: Messages to digest, in the order to present them
+            on_progress: Optional callback receiving a short progress text
+            on_chunk: Optional callback receiving the final digest while it streams in
+
+        Returns:
+            The digest
+
+        Raises:
+            Exception: If no chunk could be summarized
+        """
+        progress = on_progress or (lambda text: None)
+        progress(f"Preparing {len(messages)} messages...")
+        chunks = await asyncio.to_thread(self.chunk_messages, messages)
+        total = len(messages)
+        log.info(f"Digest of {total} messages in {len(chunks)} chunks")
+
+        if len(chunks) == 1:
+            material, count, body_chars = chunks[0]
+            progress(f"Summarizing {count} messages...")
+            return await self._generate(
+                DIGEST_PROMPT.format(source="the posts", count=count, material=material),
+                "digest", body_chars, on_chunk,
+            )
+
+        prompts = [
+            (MAP_PROMPT.format(count=count, material=material), f"digest chunk {i + 1}/{len(chunks)}", body_chars)
+            for i, (material, count, body_chars) in enumerate(chunks)
+        ]
+        notes = await self._map(prompts, lambda done, failed: progress(
+            f"Summarized {done}/{len(prompts)} chunks of {total} messages"
+            + (f" ({failed} failed)" if failed else "")
+        ))
+
+        # Combine the notes in rounds until they fit one prompt
+        round_number = 1
+        while len(notes) > 1 and estimate_tokens(SEPARATOR.join(notes)) > self.chunk_tokens:
+            groups = pack(notes, self.chunk_tokens)
+            if len(groups) == len(notes):
+                # Every note fills a prompt on its own; the model's context is far larger than the budget
+                break
+            round_number += 1
+            prompts = [
+                (DIGEST_PROMPT.format(source="notes on groups of posts", count=total, material=SEPARATOR.join(group)),
+                 f"digest round {round_number} part {i + 1}/{len(groups)}", 0)
+                for i, group in enumerate(groups)
+            ]
+            notes = await self._map(prompts, lambda done, failed: progress(
+                f"Combining notes, round {round_number}: {done}/{len(prompts)}"
+            ))
+
+        progress(f"Writing digest of {total} messages...")
+        return await self._generate(
+            DIGEST_PROMPT.format(source="notes on groups of posts", count=total, material=SEPARATOR.join(notes)),
+            "digest", 0, on_chunk,
+        )
+
+    async def _map(self, prompts: list, on_done) -> list:
+        """
+        Run prompts concurrently, at most `concurrency` at a time.
+
+        Args:
+            prompts: (prompt, label, HTML chars) tuples
+            on_done: Called with (finished, failed) counts as each prompt completes
+
+        Returns:
+            Responses of the prompts that succeeded, in prompt order
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(prompt: str, label: str, body_chars: int) -> str:
+            async with semaphore:
+                return await self._generate(prompt, label, body_chars)
+
+        tasks = [asyncio.ensure_future(run(*prompt)) for prompt in prompts]
+        done = failed = 0
+        try:
+            for future in asyncio.as_completed(tasks):
+                try:
+                    await future
+                except Exception as e:
+                    failed += 1
+                    log.error(f"Digest chunk failed: {e}")
+                done += 1
+                on_done(done, failed)
+        finally:
+            # Stop the remaining calls if the digest is cancelled
+            for task in tasks:
+                task.cancel()
+
+        results = [task.result() for task in tasks if not task.exception() and task.result()]
+        if not results:
+            raise RuntimeError(f"All {len(tasks)} digest chunks failed")
+        return results
+
+    async def _generate(self, prompt: str, label: str, body_chars: int, on_chunk=None) -> str:
+        """Response to one prompt, from the cache or the API"""
+        cache = self.summarizer.cache
+        model = self.summarizer.MODEL_NAME
+        if cache is not None:
+            try:
+                cached = cache.get("digest", prompt, model, self.PROMPT_VERSION)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                log.error(f"Error reading summary cache: {e}")
+
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        stats = {
+            "message_id": None,
+            "request": label,
+            "body_chars": body_chars,
+            "text_chars": len(prompt),
+            "prompt_chars": len(prompt),
+            "estimated_tokens": estimate_tokens(prompt),
+            "trimmed": False,
+        }
+        text = await self.summarizer.generate(prompt, stats, on_chunk=on_chunk)
+        if not text:
+            raise RuntimeError(f"Empty response for {label}")
+        if cache is not None:
+            try:
+                cache.put("digest", prompt, model, self.PROMPT_VERSION, text)
+            except Exception as e:
+                log.error(f"Error writing summary cache: {e}")
+        return text
@@ -0,0 +1,125 @@
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from message_store import strip_html
+
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> list:
+    """Split text into lowercase word tokens"""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def message_tokens(message: dict) -> set:
+    """Tokens for the searchable fields of a message: subject, plain-text body and author"""
+    author = message.get("author") or {}
+    fields = (
+        message.get("subject"),
+        strip_html(message.get("body")),
+        author.get("title"),
+        author.get("firstName"),
+        author.get("lastName"),
+    )
+    return set(tokenize(" ".join(field for field in fields if field)))
+
+
+class MessageIndex:
+    """
+    In-memory inverted index over a list of messages.
+
+    Built once at load time and queried with AND/prefix semantics: every word of
+    the query must be a prefix of some token in the message. Results keep the
+    order of the indexed messages.
+    """
+
+    # Number of per-term match sets kept around for repeated/extended queries
+    TERM_CACHE_SIZE = 256
+
+    def __init__(self, messages: list = None) -> None:
+        self.messages = []
+        self._postings = {}
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+        self._term_cache = OrderedDict()
+        self._lock = threading.Lock()
+        for message in messages or []:
+            self.add(message)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def add(self, message: dict) -> None:
+        """Index a message, appending it after the messages already indexed"""
+        position = len(self.messages)
+        self.messages.append(message)
+        with self._lock:
+            for token in message_tokens(message):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = array('I')
+                    self._vocabulary_dirty = True
+                postings.append(position)
+            self._term_cache.clear()
+
+    def _vocab(self) -> list:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    def _term_matches(self, term: str) -> frozenset:
+        """Positions of messages with a token starting with term"""
+        with self._lock:
+            cached = self._term_cache.get(term)
+            if cached is not None:
+                self._term_cache.move_to_end(term)
+                return cached
+
+            vocabulary = self._vocab()
+            start = bisect_left(vocabulary, term)
+            end = bisect_left(vocabulary, term + "\U0010ffff", start)
+            if end - start == 1:
+                matches = frozenset(self._postings[vocabulary[start]])
+            else:
+                matches = frozenset().union(*(self._postings[token] for token in vocabulary[start:end]))
+
+            self._term_cache[term] = matches
+            if len(self._term_cache) > self.TERM_CACHE_SIZE:
+                self._term_cache.popitem(last=False)
+            return matches
+
+    def search_positions(self, query: str, within=None) -> list:
+        """
+        Positions (ascending) of the messages matching every word in query.
+
+        Args:
+            query: Words that must each prefix-match a token of the message
+            within: Optional positions to narrow down, e.g. the result of a shorter
+                    query that this one extends
+
+        Returns:
+            Sorted list of matching positions
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        matches = [self._term_matches(term) for term in terms]
+        if within is not None:
+            matches.append(within if isinstance(within, (set, frozenset)) else frozenset(within))
+        matches.sort(key=len)
+        result = matches[0]
+        for other in matches[1:]:
+            if not result:
+                break
+            result = result & other
+        return sorted(result)
+
+    def search(self, query: str) -> list:
+        """Messages matching every word in query (as a prefix), in indexed order"""
+        messages = self.messages
+        return [messages[position] for position in self.search_positions(query)]
@@ -1,83 +1,369 @@
+import asyncio
+from collections.abc import Sequence
 from textual.widgets import ListView, ListItem, Static
 from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.reactive import reactive
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.strip import Strip
+from textual.cache import LRUCache
+from textual import events
 from textual import log
-from datetime import datetime, timezone
+from rich.segment import Segment
+from datetime import datetime
+import codecs
 import json
+import os
+import re
+import sys
+import time
+from message_store import MessageStore
+from message_record import DumpFile, MessageRecord
+from tracing import span, tracer
 
 
-def calculate_age(post_time_str: str) -> str:
-    """Calculate the age of a message from its post time string"""
+# Number of messages between progress callbacks while loading
+LOAD_PROGRESS_INTERVAL = 1000
+
+# Bytes read from a JSON dump at a time while streaming it
+STREAM_CHUNK_SIZE = 1 << 20
+
+_EDGES_RE = re.compile(r'"edges"\s*:\s*\[')
+_SEPARATOR_RE = re.compile(r'[\s,]*')
+
+
+def post_epoch(post_time_str: str) -> float | None:
+    """Epoch seconds of a post time string, or None if it has no usable timezone-aware time"""
     try:
         # Parse the ISO format time string
         post_time = datetime.fromisoformat(post_time_str.replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
+    except Exception:
+        return None
+    if post_time.tzinfo is None:
+        return None
+    return post_time.timestamp()
+
+
+def format_age(seconds: float) -> str:
+    """
+    Format the time since a post as "5m ago" (or "in 5m" for post times in the future).
+    
+    Args:
+        seconds: now minus the post time, in seconds
+    """
+    # Convert to total seconds (use abs to handle future dates)
+    total_seconds = abs(seconds)
+    
+    # If the post time is in the future, show "in X time"
+    if seconds < 0:
+        if total_seconds < 60:
+            return f"in {int(total_seconds)}s"
+        elif total_seconds < 3600:
+            minutes = int(total_seconds // 60)
+            return f"in {minutes}m"
+        elif total_seconds < 86400:
+            hours = int(total_seconds // 3600)
+            return f"in {hours}h"
+        elif total_seconds < 2592000:  # 30 days
+            days = int(total_seconds // 86400)
+            return f"in {days}d"
+        else:
+            months = int(total_seconds // 2592000)
+            return f"in {months}mo"
+    else:
+        # Past dates
+        if total_seconds < 60:
+            return f"{int(total_seconds)}s ago"
+        elif total_seconds < 3600:
+            minutes = int(total_seconds // 60)
+            return f"{minutes}m ago"
+        elif total_seconds < 86400:
+            hours = int(total_seconds // 3600)
+            return f"{hours}h ago"
+        elif total_seconds < 2592000:  # 30 days
+            days = int(total_seconds // 86400)
+            return f"{days}d ago"
+        else:
+            months = int(total_seconds // 2592000)
+            return f"{months}mo ago"
+
+
+def calculate_age(post_time_str: str, now: float = None) -> str:
+    """
+    Calculate the age of a message from its post time string.
+    
+    Args:
+        post_time_str: ISO format post time
+        now: Epoch seconds to measure from; pass one shared value when computing
+             many ages at once instead of reading the clock for each
+    """
+    epoch = post_epoch(post_time_str)
+    if epoch is None:
+        return "unknown"
+    return format_age((time.time() if now is None else now) - epoch)
+
+
+def message_age(message, now: float) -> str:
+    """Age of a message as of now, from its precomputed epoch when it has one"""
+    epoch = message.get("epoch")
+    if epoch is None:
+        return message.get("age") or "unknown"
+    return format_age(now - epoch)
+
+
+def normalize_message(node: dict, source=None, ref=None, authors: dict = None,
+                      now: float = None) -> MessageRecord:
+    """
+    Convert a GraphQL message node into the record used by the UI.
+    
+    Args:
+        node: Message node as returned by the messages query
+        source: Optional object to re-load the body and other fields from (see MessageRecord)
+        ref: Reference to the message within source
+        authors: Optional dict shared across calls so identical authors share one dict
+        now: Epoch seconds the age is computed from (defaults to the current time)
+    """
+    author = node["author"]
+    if authors is not None and author is not None:
+        author = authors.setdefault(
+            (author.get("title"), author.get("firstName"), author.get("lastName")), author
+        )
+    epoch = post_epoch(node["postTime"])
+    if epoch is None:
+        age = "unknown"
+    else:
+        # Interned: there are only a few hundred distinct ages across any archive
+        age = sys.intern(format_age((time.time() if now is None else now) - epoch))
+    return MessageRecord(
+        id=node["id"],
+        subject=node["subject"],
+        postTime=node["postTime"],
+        viewHref=node["viewHref"],
+        author=author,
+        age=age,
+        epoch=epoch,
+        body=node.get("body"),
+        source=source,
+        ref=ref,
+    )
+
+
+def _iter_json_edges(json_file_path: str, progress=None):
+    """
+    Yield (node, start, end) for each edge of data.messages.edges, decoding one
+    edge at a time; start and end are the byte offsets of the edge in the file.
+    """
+    total = os.path.getsize(json_file_path)
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    # Byte offset in the file of buffer[mark], advanced incrementally
+    mark = 0
+    mark_bytes = 0
+    
+    def byte_offset(position: int) -> int:
+        nonlocal mark, mark_bytes
+        text = buffer[mark:position]
+        mark_bytes += len(text) if text.isascii() else len(text.encode('utf-8'))
+        mark = position
+        return mark_bytes
+    
+    with open(json_file_path, 'rb') as f:
+        def read_more() -> bool:
+            nonlocal buffer, pos, mark
+            # Grow the read size with the buffer so a huge edge is not re-parsed once per chunk
+            chunk = f.read(max(STREAM_CHUNK_SIZE, len(buffer) - pos))
+            byte_offset(pos)
+            buffer = buffer[pos:] + utf8.decode(chunk, final=not chunk)
+            pos = mark = 0
+            if progress:
+                progress(mark_bytes, total)
+            return bool(chunk)
         
-        # Calculate the difference (use abs to handle future dates)
-        diff = abs(now - post_time)
+        # The dump is {"data": {"messages": {"edges": [...]}}}; skip to the array
+        while True:
+            match = _EDGES_RE.search(buffer)
+            if match:
+                pos = match.end()
+                break
+            if not read_more():
+                raise ValueError("no data.messages.edges array found")
         
-        # Convert to total seconds
-        total_seconds = diff.total_seconds()
+        while True:
+            pos = _SEPARATOR_RE.match(buffer, pos).end()
+            if pos == len(buffer):
+                if not read_more():
+                    raise ValueError("unexpected end of file inside data.messages.edges")
+                continue
+            if buffer[pos] == ']':
+                break
+            try:
+                edge, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The edge is cut off at the end of the buffer; retry with more data
+                if read_more():
+                    continue
+                raise
+            start = byte_offset(pos)
+            pos = end
+            yield edge["node"], start, byte_offset(end)
+    
+    if progress:
+        progress(total, total)
+
+
+def _iter_jsonl_nodes(json_file_path: str, progress=None):
+    """Yield (node, start, end) for each line of a JSONL file written by fetch_posts.py --paginate"""
+    total = os.path.getsize(json_file_path)
+    parsed_bytes = 0
+    with open(json_file_path, 'rb') as f:
+        for count, line in enumerate(f, 1):
+            start = parsed_bytes
+            parsed_bytes += len(line)
+            if line.strip():
+                yield json.loads(line), start, parsed_bytes
+            if progress and count % LOAD_PROGRESS_INTERVAL == 0:
+                progress(parsed_bytes, total)
+    if progress:
+        progress(total, total)
+
+
+def iter_messages_from_json(json_file_path: str = "top_posters_output.json", progress=None,
+                            keep_bodies: bool = False):
+    """
+    Stream messages from a dump one node at a time, without parsing the whole file first.
+    
+    Bodies, post times and URLs are not kept in memory: each record re-reads
+    them from a memory-mapped view of the file when they are asked for.
+    
+    Args:
+        json_file_path: JSON response dump, or a .jsonl file with one node per line
+        progress: Optional callback called as progress(bytes_parsed, total_bytes)
+        keep_bodies: Leave the parsed body on each record, e.g. to index it, in
+                     which case the caller should call release() when done
         
-        # If the post time is in the future, show "in X time"
-        if now < post_time:
-            if total_seconds < 60:
-                return f"in {int(total_seconds)}s"
-            elif total_seconds < 3600:
-                minutes = int(total_seconds // 60)
-                return f"in {minutes}m"
-            elif total_seconds < 86400:
-                hours = int(total_seconds // 3600)
-                return f"in {hours}h"
-            elif total_seconds < 2592000:  # 30 days
-                days = int(total_seconds // 86400)
-                return f"in {days}d"
-            else:
-                months = int(total_seconds // 2592000)
-                return f"in {months}mo"
-        else:
-            # Past dates
-            if total_seconds < 60:
-                return f"{int(total_seconds)}s ago"
-            elif total_seconds < 3600:
-                minutes = int(total_seconds // 60)
-                return f"{minutes}m ago"
-            elif total_seconds < 86400:
-                hours = int(total_seconds // 3600)
-                return f"{hours}h ago"
-            elif total_seconds < 2592000:  # 30 days
-                days = int(total_seconds // 86400)
-                return f"{days}d ago"
-            else:
-                months = int(total_seconds // 2592000)
-                return f"{months}mo ago"
-    except Exception as e:
-        return "unknown"
+    Yields:
+        MessageRecord objects in file order
+    """
+    if json_file_path.endswith('.jsonl'):
+        nodes = _iter_jsonl_nodes(json_file_path, progress)
+    else:
+        nodes = _iter_json_edges(json_file_path, progress)
+    dump = DumpFile(json_file_path)
+    authors = {}
+    now = time.time()
+    for node, start, end in nodes:
+        message = normalize_message(node, dump, DumpFile.ref(start, end), authors, now)
+        if not keep_bodies:
+            message.release()
+        yield message
 
 
 def load_messages_from_json(json_file_path: str = "top_posters_output.json") -> list:
     """Load and process messages from a JSON file"""
     try:
-        with open(json_file_path, 'r') as f:
-            data = json.load(f)
-        
-        messages = [
-            {
-                "subject": msg["node"]["subject"],
-                "body": msg["node"]["body"],
-                "id": msg["node"]["id"],
-                "postTime": msg["node"]["postTime"],
-                "viewHref": msg["node"]["viewHref"],
-                "author": msg["node"]["author"],
-                "age": calculate_age(msg["node"]["postTime"])
-            }
-            for msg in data["data"]["messages"]["edges"]
-        ]
-        return messages
+        return list(iter_messages_from_json(json_file_path))
     except Exception as e:
         log.error(f"Error loading messages from {json_file_path}: {e}")
         return []
 
 
+def iter_messages_from_store(store: MessageStore, progress=None):
+    """
+    Stream normalized messages from a SQLite MessageStore, newest first.
+    
+    Args:
+        store: Store to read from
+        progress: Optional callback called as progress(loaded, total) every
+                  LOAD_PROGRESS_INTERVAL messages
+    """
+    total = store.count() if progress else 0
+    authors = {}
+    now = time.time()
+    # Bodies stay in the store, and post times and URLs are read back on demand
+    for count, node in enumerate(store.iter_messages(with_body=False), 1):
+        message = normalize_message(node, store, node["id"], authors, now)
+        message.release()
+        yield message
+        if progress and count % LOAD_PROGRESS_INTERVAL == 0:
+            progress(count, total)
+
+
+class StoreMessages(Sequence):
+    """
+    Messages of a MessageStore, newest first, read a page at a time as they are accessed.
+    
+    Stands in for the list of records, so showing and scrolling the store costs
+    the same however large the archive grows: only the count is read up front.
+    Recently read pages are cached; a page read again gives new record objects.
+    The count is taken once, so messages added to the store later show up in a
+    new StoreMessages.
+    """
+    
+    # Messages read per query, and pages kept in memory
+    PAGE_SIZE = 200
+    CACHED_PAGES = 50
+    
+    def __init__(self, store: MessageStore, ids: list = None) -> None:
+        """
+        Args:
+            store: Store to read from
+            ids: Ids of the messages in order, e.g. search results; all stored messages if None
+        """
+        self.store = store
+        self.ids = ids
+        self._count = store.count() if ids is None else len(ids)
+        self._pages = LRUCache(self.CACHED_PAGES)
+        self._positions = None
+        self._authors = {}
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("message index out of range")
+        page, offset = divmod(index, self.PAGE_SIZE)
+        records = self._pages.get(page)
+        if records is None:
+            records = self._read_page(page)
+            self._pages[page] = records
+        return records[offset]
+    
+    def _read_page(self, page: int) -> list:
+        start = page * self.PAGE_SIZE
+        if self.ids is None:
+            nodes = self.store.page(start, self.PAGE_SIZE)
+        else:
+            nodes = self.store.messages_by_ids(self.ids[start:start + self.PAGE_SIZE])
+        now = time.time()
+        # Bodies stay in the store and are read back on demand
+        return [normalize_message(node, self.store, node["id"], self._authors, now) for node in nodes]
+    
+    def position(self, message_id: str) -> int | None:
+        """Position of the message with this id, or None if it is not among these messages"""
+        if self.ids is None:
+            return self.store.position(message_id)
+        if self._positions is None:
+            self._positions = {message_id: position for position, message_id in enumerate(self.ids)}
+        return self._positions.get(message_id)
+
+
+def load_messages_from_store(store: MessageStore) -> list:
+    """Load and process messages from a SQLite MessageStore, newest first"""
+    try:
+        return list(iter_messages_from_store(store))
+    except Exception as e:
+        log.error(f"Error loading messages from {store.db_path}: {e}")
+        return []
+
+
 class MessageSelected(Message):
     """Message sent when a message item is selected"""
     def __init__(self, item: dict) -> None:
@@ -85,56 +371,436 @@ class MessageSelected(Message):
         super().__init__()
 
 
+def format_message_row(subject: str, age: str, width: int) -> str:
+    """Format a subject and age as one list row, truncating the subject to fit width"""
+    age_width = len(age) + 2  # +2 for parentheses
+    subject_width = width - age_width - 1  # -1 for space
+    
+    # Truncate subject if needed
+    display_subject = subject[:subject_width-3] + "..." if len(subject) > subject_width else subject
+    display_subject = display_subject.ljust(subject_width)
+    
+    return f"{display_subject} ({age})"
+
+
+class MessageRow:
+    """Rich renderable that formats a message row for the width it is rendered at"""
+    
+    def __init__(self, subject: str, age: str) -> None:
+        self.subject = subject
+        self.age = age
+    
+    def __rich_console__(self, console, options):
+        yield format_message_row(self.subject, self.age, options.max_width)
+
+
 class MessageItem(Static):
     """Custom widget to display message subject and age"""
     
-    def __init__(self, subject: str, age: str) -> None:
+    def __init__(self, subject: str, age: str, epoch: float = None) -> None:
         self.subject = subject
         self.age = age
+        self.epoch = epoch
         super().__init__()
     
-    def render(self) -> str:
-        # Calculate available width and format the display
-        width = self.size.width if self.size else 80
-        age_width = len(self.age) + 2  # +2 for parentheses
-        subject_width = width - age_width - 1  # -1 for space
-        
-        # Truncate subject if needed
-        display_subject = self.subject[:subject_width-3] + "..." if len(self.subject) > subject_width else self.subject
-        display_subject = display_subject.ljust(subject_width)
-        
-        return f"{display_subject} ({self.age})"
+    def refresh_age(self, now: float) -> None:
+        """Recompute the age label as of now, repainting only if it changed"""
+        if self.epoch is None:
+            return
+        age = format_age(now - self.epoch)
+        if age != self.age:
+            self.age = age
+            self.refresh()
+    
+    def render(self) -> MessageRow:
+        # Width comes from the render options, so rendering never forces a
+        # layout pass to look up this widget's size
+        return MessageRow(self.subject, self.age)
 
 
 class MessageList(ListView):
     """A reusable list view widget for displaying messages"""
     
+    # Seconds between refreshes of the age labels on visible rows
+    AGE_REFRESH_INTERVAL = 30
+    
     def __init__(self, messages: list = None, **kwargs) -> None:
-        self.messages = messages or []
+        # Messages in the order their ListItems are currently mounted; changed only
+        # once an update has been applied, so it always agrees with self.index
+        self._rendered_messages = list(messages or [])
+        self.messages = self._rendered_messages
+        # Target of the latest update_messages call plus later appends, which may still be applying
+        self._pending_messages = list(self._rendered_messages)
+        self._update_lock = asyncio.Lock()
+        # Shared clock for the ages shown in the rows, advanced by the refresh timer
+        self.now = time.time()
         super().__init__(**kwargs)
     
+    def on_mount(self) -> None:
+        self.set_interval(self.AGE_REFRESH_INTERVAL, self.refresh_ages)
+    
+    def _make_item(self, msg: dict) -> ListItem:
+        item = ListItem(MessageItem(msg["subject"], message_age(msg, self.now), msg.get("epoch")))
+        item.message_id = msg["id"]
+        return item
+    
+    def refresh_ages(self) -> None:
+        """Advance the shared clock and update the age labels of the rows on screen only"""
+        self.now = time.time()
+        items = [child for child in self.children if isinstance(child, ListItem)]
+        # Every row is one line high, so the scroll offset is the first visible row
+        first = max(0, int(self.scroll_y))
+        for item in items[first:first + self.size.height + 1]:
+            for message_item in item.query(MessageItem):
+                message_item.refresh_age(self.now)
+    
     def compose(self):
         for msg in self.messages:
-            yield ListItem(MessageItem(msg["subject"], msg["age"]))
+            yield self._make_item(msg)
 
     def on_list_view_highlighted(self, event: ListView.Highlighted) -> None:
-        log.info(f"Message highlighted at index {event.list_view.index}")
         if (event.list_view.index is not None and 
-            0 <= event.list_view.index < len(self.messages)):
-            selected_message = self.messages[event.list_view.index]
-            log.info(f"Highlighted message: {selected_message}")
+            0 <= event.list_view.index < len(self._rendered_messages)):
+            selected_message = self._rendered_messages[event.list_view.index]
             self.post_message(MessageSelected(selected_message))
     
     def update_messages(self, messages: list) -> None:
-        """Update the messages displayed in the list"""
+        """
+        Update the messages displayed in the list.
+        
+        Rows are diffed by message id: only rows that disappeared are removed,
+        only new rows are mounted, and surviving rows are moved if their order
+        changed. The highlighted message and its on-screen position are kept
+        when it survives the update. `messages` and `index` keep describing the
+        rows on screen until the update has been applied.
+        """
         log.info(f"Updating message list with {len(messages)} messages")
-        self.messages = messages
-        self.clear()
-        for msg in self.messages:
-            self.append(ListItem(MessageItem(msg["subject"], msg["age"])))
-        log.info(f"Message list updated, now has {len(self.messages)} items")
+        # A copy of our own, so append_messages can extend it in place
+        self._pending_messages = pending = list(messages)
+        self.run_worker(self._apply_update(pending), group="update-messages")
+    
+    async def _apply_update(self, pending: list) -> None:
+        async with self._update_lock:
+            if pending is not self._pending_messages:
+                # Superseded by a newer update while waiting for the lock
+                return
+            started = time.perf_counter()
+            # Appends arriving while this update awaits its mounts are applied after it
+            messages = list(pending)
+            
+            old_messages = self._rendered_messages
+            items = [child for child in self.children if isinstance(child, ListItem)]
+            highlighted_id = None
+            viewport_row = 0
+            if self.index is not None and 0 <= self.index < len(old_messages):
+                highlighted_id = old_messages[self.index]["id"]
+                viewport_row = self.index - round(self.scroll_y)
+            
+            new_ids = [msg["id"] for msg in messages]
+            new_id_set = set(new_ids)
+            kept = {}
+            removed = []
+            for item in items:
+                if item.message_id in new_id_set and item.message_id not in kept:
+                    kept[item.message_id] = item
+                else:
+                    removed.append(item)
+            if removed:
+                await self.remove_children(removed)
+            
+            # The children are now: [rows placed so far, in new order] followed by
+            # [surviving rows not yet placed, in old order]. Walk the new order,
+            # mounting runs of new rows and moving survivors only when out of place.
+            unplaced = [item for item in items if kept.get(item.message_id) is item]
+            next_unplaced = 0
+            placed = set()
+            previous = None
+            pending = []
+            mounts = []
+            
+            def flush_pending():
+                nonlocal previous
+                if not pending:
+                    return
+                if previous is not None:
+                    mounts.append(self.mount(*pending, after=previous))
+                elif self.children:
+                    mounts.append(self.mount(*pending, before=0))
+                else:
+                    mounts.append(self.mount(*pending))
+                previous = pending[-1]
+                pending.clear()
+            
+            for msg in messages:
+                item = kept.pop(msg["id"], None)
+                if item is None:
+                    pending.append(self._make_item(msg))
+                    continue
+                
+                flush_pending()
+                while next_unplaced < len(unplaced) and unplaced[next_unplaced] in placed:
+                    next_unplaced += 1
+                if next_unplaced < len(unplaced) and unplaced[next_unplaced] is item:
+                    next_unplaced += 1
+                elif previous is not None:
+                    self.move_child(item, after=previous)
+                else:
+                    self.move_child(item, before=0)
+                placed.add(item)
+                previous = item
+            flush_pending()
+            for mount in mounts:
+                await mount
+            
+            self._rendered_messages = messages
+            self.messages = messages
+            
+            if highlighted_id is not None and highlighted_id in new_id_set:
+                # Keep the highlighted message where it was on screen
+                new_index = new_ids.index(highlighted_id)
+                self.index = new_index
+                self.call_after_refresh(self.scroll_to, y=max(0, new_index - viewport_row), animate=False)
+            else:
+                # Announce the new first row even if the numeric index is unchanged
+                self.index = None
+                self.index = 0 if messages else None
+            tracer.record("list.update", time.perf_counter() - started)
+            log.info(f"Message list updated, now has {len(self._rendered_messages)} items")
+    
+    def append_messages(self, messages: list) -> None:
+        """
+        Add messages after the ones already listed, e.g. while a dump is still loading.
+        
+        Only the new rows are mounted; existing rows and the highlight are left alone.
+        """
+        if messages:
+            self._pending_messages.extend(messages)
+            self.run_worker(self._apply_append(self._pending_messages), group="update-messages")
+    
+    async def _apply_append(self, pending: list) -> None:
+        async with self._update_lock:
+            if pending is not self._pending_messages:
+                # A newer update replaced the list; it brings its own rows
+                return
+            # An update applied in the meantime may already have mounted these rows
+            new_messages = pending[len(self._rendered_messages):]
+            if not new_messages:
+                return
+            with span("list.append"):
+                await self.mount(*(self._make_item(msg) for msg in new_messages))
+                self._rendered_messages.extend(new_messages)
+            if self.index is None:
+                self.index = 0
     
     def load_messages_from_file(self, json_file_path: str) -> None:
         """Load messages from a JSON file and update the list"""
         messages = load_messages_from_json(json_file_path)
-        self.update_messages(messages) 
\ No newline at end of file
+        self.update_messages(messages) 
+
+
+class VirtualMessageList(ScrollView, can_focus=True):
+    """
+    A virtualized list view for displaying messages.
+
+    Drop-in alternative to MessageList for large archives: the full message
+    sequence is kept as data and rows are rendered on demand for the viewport
+    (plus a small overscan kept in a cache) instead of mounting one widget per
+    message. The sequence can be StoreMessages, so rows of the message store
+    are only read once they are shown. Exposes the same `messages`, `index` and `update_messages` API and
+    posts MessageSelected when the highlighted row changes.
+    """
+
+    # Rows above and below the viewport whose rendered strips are kept cached
+    OVERSCAN = 10
+
+    COMPONENT_CLASSES = {"message-list--cursor"}
+
+    DEFAULT_CSS = """
+    VirtualMessageList {
+        overflow-x: hidden;
+        & > .message-list--cursor {
+            color: $block-cursor-blurred-foreground;
+            background: $block-cursor-blurred-background;
+            text-style: $block-cursor-blurred-text-style;
+        }
+        &:focus > .message-list--cursor {
+            color: $block-cursor-foreground;
+            background: $block-cursor-background;
+            text-style: $block-cursor-text-style;
+        }
+    }
+    """
+
+    BINDINGS = [
+        Binding("up", "cursor_up", "Cursor up", show=False),
+        Binding("down", "cursor_down", "Cursor down", show=False),
+        Binding("pageup", "cursor_page_up", "Page up", show=False),
+        Binding("pagedown", "cursor_page_down", "Page down", show=False),
+        Binding("home", "cursor_first", "First message", show=False),
+        Binding("end", "cursor_last", "Last message", show=False),
+    ]
+
+    index = reactive(None, init=False)
+
+    # Seconds between refreshes of the age labels on visible rows
+    AGE_REFRESH_INTERVAL = 30
+
+    def __init__(self, messages: list = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.messages = messages or []
+        self._row_cache = LRUCache(128)
+        self.virtual_size = Size(0, len(self.messages))
+        # Shared clock for the ages shown in the rows, advanced by the refresh timer
+        self.now = time.time()
+
+    def on_mount(self) -> None:
+        self.set_interval(self.AGE_REFRESH_INTERVAL, self.refresh_ages)
+
+    def refresh_ages(self) -> None:
+        """
+        Advance the shared clock used for row ages.
+
+        Ages are computed from each message's epoch when a row is rendered, so
+        only the rows on screen (and the overscan cache) are redone.
+        """
+        self.now = time.time()
+        self._row_cache.clear()
+        self.refresh()
+
+    def validate_index(self, index: int | None) -> int | None:
+        """Clamp the index to the valid range, or None if there is nothing to highlight"""
+        if index is None or not self.messages:
+            return None
+        return max(0, min(index, len(self.messages) - 1))
+
+    def watch_index(self, old_index: int | None, new_index: int | None) -> None:
+        self._refresh_row(old_index)
+        self._refresh_row(new_index)
+        if new_index is not None:
+            self.scroll_to_region(Region(0, new_index, 1, 1), animate=False, force=True)
+            self.post_message(MessageSelected(self.messages[new_index]))
+
+    def _refresh_row(self, row: int | None) -> None:
+        if row is None:
+            return
+        self._row_cache.discard(row)
+        self.refresh_line(row)
+
+    def on_resize(self, event: events.Resize) -> None:
+        # Keep the viewport plus overscan cached, and re-render at the new width
+        self._row_cache.grow(event.size.height + 2 * self.OVERSCAN)
+        self._row_cache.clear()
+
+    def on_focus(self) -> None:
+        self._refresh_row(self.index)
+
+    def on_blur(self) -> None:
+        self._refresh_row(self.index)
+
+    def render_line(self, y: int) -> Strip:
+        row = self.scroll_offset.y + y
+        width = self.scrollable_content_region.width
+        if row >= len(self.messages):
+            return Strip.blank(width, self.rich_style)
+
+        strip = self._row_cache.get(row)
+        if strip is None or strip.cell_length != width:
+            msg = self.messages[row]
+            if row == self.index:
+                style = self.rich_style + self.get_component_rich_style("message-list--cursor")
+            else:
+                style = self.rich_style
+            text = format_message_row(msg["subject"], message_age(msg, self.now), width)
+            strip = Strip([Segment(text, style)]).adjust_cell_length(width, style)
+            self._row_cache[row] = strip
+        return strip
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is not None:
+            self.index = self.scroll_offset.y + offset.y
+            self.focus()
+
+    def action_cursor_up(self) -> None:
+        if self.index is None:
+            self.index = 0
+        else:
+            self.index -= 1
+
+    def action_cursor_down(self) -> None:
+        if self.index is None:
+            self.index = 0
+        else:
+            self.index += 1
+
+    def action_cursor_page_up(self) -> None:
+        self.index = (self.index or 0) - max(1, self.scrollable_content_region.height - 1)
+
+    def action_cursor_page_down(self) -> None:
+        self.index = (self.index or 0) + max(1, self.scrollable_content_region.height - 1)
+
+    def action_cursor_first(self) -> None:
+        self.index = 0
+
+    def action_cursor_last(self) -> None:
+        self.index = len(self.messages) - 1
+
+    def update_messages(self, messages: list) -> None:
+        """
+        Update the messages displayed in the list.
+        
+        The highlighted message and its on-screen position are kept when it
+        survives the update; otherwise the first row is selected.
+        """
+        log.info(f"Updating message list with {len(messages)} messages")
+        with span("list.update"):
+            highlighted_id = None
+            viewport_row = 0
+            if self.index is not None:
+                highlighted_id = self.messages[self.index]["id"]
+                viewport_row = self.index - self.scroll_offset.y
+        
+            # A copy of our own, so append_messages can extend it in place; messages
+            # read from the store on demand are never appended to and are not copied
+            self.messages = messages if isinstance(messages, StoreMessages) else list(messages)
+            self._row_cache.clear()
+            self.virtual_size = Size(0, len(self.messages))
+            self.refresh()
+        
+            new_index = None
+            if highlighted_id is not None:
+                if isinstance(messages, StoreMessages):
+                    new_index = messages.position(highlighted_id)
+                else:
+                    new_index = next(
+                        (position for position, msg in enumerate(self.messages) if msg["id"] == highlighted_id), None
+                    )
+            if new_index is not None:
+                # Same message stays highlighted, so there is nothing new to announce
+                self.set_reactive(VirtualMessageList.index, new_index)
+                self.call_after_refresh(self.scroll_to, y=max(0, new_index - viewport_row), animate=False)
+            else:
+                self.scroll_to(y=0, animate=False)
+                # Re-select the first row (always announcing it, even if index was already 0)
+                self.set_reactive(VirtualMessageList.index, None)
+                self.index = 0 if self.messages else None
+        log.info(f"Message list updated, now has {len(self.messages)} items")
+
+    def append_messages(self, messages: list) -> None:
+        """
+        Add messages after the ones already listed, e.g. while a dump is still loading.
+        
+        Existing rows and the highlighted message are left alone.
+        """
+        if not messages:
+            return
+        self.messages.extend(messages)
+        self.virtual_size = Size(0, len(self.messages))
+        self.refresh()
+        if self.index is None:
+            self.index = 0
+
+    def load_messages_from_file(self, json_file_path: str) -> None:
+        """Load messages from a JSON file and update the list"""
+        messages = load_messages_from_json(json_file_path)
+        self.update_messages(messages)
@@ -0,0 +1,134 @@
+import json
+import mmap
+import threading
+
+
+class DumpFile:
+    """
+    Read-only, memory-mapped view of a fetched dump used to load message fields on demand.
+
+    References are byte ranges of one edge of a JSON dump, or of one line of a
+    JSONL file written by fetch_posts.py --paginate, packed into a single int
+    (see ref) since one is kept per message.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.jsonl = path.endswith('.jsonl')
+        self._file = None
+        self._map = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def ref(start: int, end: int) -> int:
+        """Reference to the bytes start:end of the dump; an int takes a third of a (start, end) tuple"""
+        return start << 32 | (end - start)
+
+    def _mapped(self) -> mmap.mmap:
+        with self._lock:
+            if self._map is None:
+                self._file = open(self.path, 'rb')
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map
+
+    def load_field(self, ref: int, key: str) -> str:
+        start = ref >> 32
+        item = json.loads(self._mapped()[start:start + (ref & 0xFFFFFFFF)])
+        node = item if self.jsonl else item["node"]
+        return node.get(key) or ""
+
+    def load_body(self, ref: int) -> str:
+        return self.load_field(ref, "body")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._file.close()
+                self._map = None
+                self._file = None
+
+
+class MessageRecord:
+    """
+    Compact record for one message, readable like the dicts it replaces.
+
+    Supports msg["subject"], msg.get("author") and "body" in msg. Once a source
+    is set and the record is released (see release), only the id, author and
+    age stay in memory: the subject, HTML body, post time and URL are read back
+    from the source on every access. A source is anything with a
+    load_field(ref, key) method, e.g. DumpFile or MessageStore.
+    """
+
+    __slots__ = ("id", "author", "age", "epoch", "_fields", "_source", "_ref")
+
+    KEYS = ("subject", "body", "id", "postTime", "viewHref", "author", "age", "epoch")
+
+    def __init__(self, id: str, subject: str, postTime: str, viewHref: str, author: dict, age: str,
+                 epoch: float = None, body: str = None, source=None, ref=None) -> None:
+        self.id = id
+        self.author = author
+        self.age = age
+        # Post time as epoch seconds, so ages can be recomputed without parsing
+        self.epoch = epoch
+        # Fields held in memory until release(); None once they are read from the source
+        self._fields = {"subject": subject, "body": body, "postTime": postTime, "viewHref": viewHref}
+        self._source = source
+        self._ref = ref
+
+    def _field(self, key: str) -> str:
+        value = self._fields[key] if self._fields is not None else None
+        if value is not None:
+            return value
+        if self._source is not None:
+            return self._source.load_field(self._ref, key)
+        return ""
+
+    @property
+    def subject(self) -> str:
+        return self._field("subject")
+
+    @property
+    def body(self) -> str:
+        return self._field("body")
+
+    @property
+    def postTime(self) -> str:
+        return self._field("postTime")
+
+    @property
+    def viewHref(self) -> str:
+        return self._field("viewHref")
+
+    def release(self) -> None:
+        """Drop the subject, body, post time and URL from memory if they can be loaded again from the source"""
+        if self._source is not None:
+            self._fields = None
+
+    def content_key(self) -> tuple:
+        """
+        Cheap identity of the message's content, e.g. for render caches.
+
+        Where the body is read from if it is out of memory, so the body is not
+        loaded just to build the key; otherwise a hash of the body.
+        """
+        if self._source is not None and (self._fields is None or self._fields["body"] is None):
+            return (self._source, self._ref)
+        return (hash(self.body),)
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.KEYS
+
+    def keys(self) -> tuple:
+        return self.KEYS
+
+    def __repr__(self) -> str:
+        return f"MessageRecord(id={self.id!r})"
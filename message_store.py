@@ -0,0 +1,293 @@
+import html
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    first_name TEXT NOT NULL DEFAULT '',
+    last_name TEXT NOT NULL DEFAULT '',
+    UNIQUE (title, first_name, last_name)
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    subject TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL DEFAULT '',
+    post_time TEXT NOT NULL DEFAULT '',
+    post_epoch REAL NOT NULL DEFAULT 0,
+    view_href TEXT NOT NULL DEFAULT '',
+    author_id INTEGER REFERENCES authors(id)
+);
+
+-- Newest first, the order every listing and search uses; replaces the post_epoch-only index
+DROP INDEX IF EXISTS messages_post_epoch;
+CREATE INDEX IF NOT EXISTS messages_order ON messages (post_epoch DESC, id DESC);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    subject, body_text, author_name, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_TERM_RE = re.compile(r'\w+')
+
+
+def strip_html(body: str) -> str:
+    """Cheap HTML to plain text conversion used for indexing (not for display)"""
+    text = _TAG_RE.sub(' ', body or '')
+    return ' '.join(html.unescape(text).split())
+
+
+def post_time_to_epoch(post_time: str) -> float:
+    """Convert a Khoros postTime string to epoch seconds (0 if it cannot be parsed)"""
+    try:
+        return datetime.fromisoformat(post_time.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def build_match_query(text: str) -> str:
+    """Turn free text into an FTS5 query that ANDs a prefix match for every word"""
+    return " ".join(f'"{term}"*' for term in _TERM_RE.findall(text))
+
+
+class MessageStore:
+    """
+    On-disk SQLite store for messages and their authors.
+
+    Keeps an FTS5 index over subject, plain-text body and author names so that
+    search cost does not grow linearly with the size of the archive.
+    """
+
+    # Rows fetched per lock acquisition while iterating over all messages
+    ITER_BATCH_SIZE = 500
+
+    # Columns of the node fields load_field() can read
+    FIELD_COLUMNS = {"subject": "subject", "body": "body", "postTime": "post_time", "viewHref": "view_href"}
+
+    def __init__(self, db_path: str = "messages.db") -> None:
+        self.db_path = db_path
+        # Shared with worker threads (e.g. live filtering), serialized by the lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _author_id(self, author: dict) -> int:
+        key = (
+            author.get("title") or "",
+            author.get("firstName") or "",
+            author.get("lastName") or "",
+        )
+        self.conn.execute(
+            "INSERT OR IGNORE INTO authors (title, first_name, last_name) VALUES (?, ?, ?)", key
+        )
+        row = self.conn.execute(
+            "SELECT id FROM authors WHERE title = ? AND first_name = ? AND last_name = ?", key
+        ).fetchone()
+        return row[0]
+
+    def upsert_messages(self, nodes) -> int:
+        """
+        Insert or update GraphQL message nodes, keeping the FTS index in sync.
+
+        Args:
+            nodes: Iterable of message node dicts as returned by the messages query
+
+        Returns:
+            Number of nodes written
+        """
+        count = 0
+        with self.lock, self.conn:
+            for node in nodes:
+                author = node.get("author") or {}
+                author_id = self._author_id(author)
+                post_time = node.get("postTime") or ""
+                rowid = self.conn.execute(
+                    """
+                    INSERT INTO messages (id, subject, body, post_time, post_epoch, view_href, author_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        subject = excluded.subject,
+                        body = excluded.body,
+                        post_time = excluded.post_time,
+                        post_epoch = excluded.post_epoch,
+                        view_href = excluded.view_href,
+                        author_id = excluded.author_id
+                    RETURNING rowid
+                    """,
+                    (
+                        node["id"],
+                        node.get("subject") or "",
+                        node.get("body") or "",
+                        post_time,
+                        post_time_to_epoch(post_time),
+                        node.get("viewHref") or "",
+                        author_id,
+                    ),
+                ).fetchone()[0]
+                author_name = " ".join(
+                    part for part in (author.get("firstName"), author.get("lastName"), author.get("title")) if part
+                )
+                self.conn.execute("DELETE FROM messages_fts WHERE rowid = ?", (rowid,))
+                self.conn.execute(
+                    "INSERT INTO messages_fts (rowid, subject, body_text, author_name) VALUES (?, ?, ?, ?)",
+                    (rowid, node.get("subject") or "", strip_html(node.get("body")), author_name),
+                )
+                count += 1
+        return count
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def iter_messages(self, with_body: bool = True):
+        """
+        Yield stored messages newest first, in the same shape as the GraphQL nodes.
+        
+        Args:
+            with_body: Include the HTML body; without it the "body" key is left out
+                       and load_field() can fetch it later
+        """
+        with self.lock:
+            cursor = self.conn.execute(
+                f"{self._node_select(with_body)} ORDER BY m.post_epoch DESC, m.id DESC"
+            )
+            rows = cursor.fetchmany(self.ITER_BATCH_SIZE)
+        # Only hold the lock while fetching, so other threads can query between batches
+        while rows:
+            for row in rows:
+                yield self._node(row, with_body)
+            with self.lock:
+                rows = cursor.fetchmany(self.ITER_BATCH_SIZE)
+
+    def page(self, offset: int, limit: int) -> list:
+        """
+        Stored messages newest first from position offset on, without bodies (see iter_messages)
+
+        Args:
+            offset: Position of the first message, 0 being the newest
+            limit: Largest number of messages to return
+        """
+        # Skip to the page in the covering order index first, so skipped rows are never joined
+        with self.lock:
+            rows = self.conn.execute(
+                f"""
+                {self._node_select(False)}
+                JOIN (
+                    SELECT rowid FROM messages ORDER BY post_epoch DESC, id DESC LIMIT ? OFFSET ?
+                ) p ON p.rowid = m.rowid
+                ORDER BY m.post_epoch DESC, m.id DESC
+                """,
+                (limit, offset),
+            ).fetchall()
+        return [self._node(row, False) for row in rows]
+
+    def messages_by_ids(self, message_ids: list) -> list:
+        """Stored messages with these ids in the same order, without bodies; ids not in the store are skipped"""
+        if not message_ids:
+            return []
+        with self.lock:
+            rows = self.conn.execute(
+                f"{self._node_select(False)} WHERE m.id IN ({', '.join('?' * len(message_ids))})",
+                list(message_ids),
+            ).fetchall()
+        nodes = {row[0]: self._node(row, False) for row in rows}
+        return [nodes[message_id] for message_id in message_ids if message_id in nodes]
+
+    def position(self, message_id: str) -> int | None:
+        """Position of a message in newest-first order (the offset of page()), or None if it is not stored"""
+        with self.lock:
+            row = self.conn.execute("SELECT post_epoch FROM messages WHERE id = ?", (message_id,)).fetchone()
+            if row is None:
+                return None
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE post_epoch > ? OR (post_epoch = ? AND id > ?)",
+                (row[0], row[0], message_id),
+            ).fetchone()[0]
+
+    @staticmethod
+    def _node_select(with_body: bool) -> str:
+        body_column = "m.body" if with_body else "NULL"
+        return f"""
+            SELECT m.id, m.subject, {body_column}, m.post_time, m.view_href,
+                   a.title, a.first_name, a.last_name
+            FROM messages m LEFT JOIN authors a ON a.id = m.author_id
+        """
+
+    @staticmethod
+    def _node(row: tuple, with_body: bool) -> dict:
+        id, subject, body, post_time, view_href, title, first_name, last_name = row
+        node = {
+            "id": id,
+            "subject": subject,
+            "postTime": post_time,
+            "viewHref": view_href,
+            "author": {
+                "title": title or None,
+                "lastName": last_name or None,
+                "firstName": first_name or None,
+            },
+        }
+        if with_body:
+            node["body"] = body
+        return node
+    
+    def load_field(self, message_id: str, key: str) -> str:
+        """
+        One field of a stored message, by its GraphQL node key ("" if the message is not in the store)
+
+        Args:
+            message_id: Id of the message
+            key: "subject", "body", "postTime" or "viewHref"
+        """
+        column = self.FIELD_COLUMNS[key]
+        with self.lock:
+            row = self.conn.execute(f"SELECT {column} FROM messages WHERE id = ?", (message_id,)).fetchone()
+        return row[0] if row else ""
+
+    def load_body(self, message_id: str) -> str:
+        """HTML body of a stored message ("" if it is not in the store)"""
+        return self.load_field(message_id, "body")
+
+    def search(self, text: str) -> list:
+        """
+        Full-text search over subject, body and author names.
+
+        Every word in text must match (as a prefix) somewhere in the message.
+
+        Returns:
+            Matching message ids, newest first
+        """
+        query = build_match_query(text)
+        if not query:
+            return []
+        with self.lock:
+            rows = self.conn.execute(
+                """
+                SELECT m.id FROM messages_fts f JOIN messages m ON m.rowid = f.rowid
+                WHERE messages_fts MATCH ?
+                ORDER BY m.post_epoch DESC, m.id DESC
+                """,
+                (query,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def high_water_mark(self):
+        """Return {"postTime", "id"} of the newest stored message, or None if empty"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT post_time, id FROM messages ORDER BY post_epoch DESC, id DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        return {"postTime": row[0], "id": row[1]}
@@ -1,9 +1,76 @@
 from textual.widgets import Static
 from textual.reactive import reactive
+from textual.worker import get_current_worker
 from textual import log
 from html2text import HTML2Text
+from collections import OrderedDict
+from functools import partial
+import threading
 import re
 
+from message_record import MessageRecord
+from tracing import span
+
+
+_ENTITY_RE = re.compile(r'&[a-zA-Z0-9#]+;')
+_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_URL_RE = re.compile(r'https?://[^\s]+')
+_DISALLOWED_RE = re.compile(r'[^\w\s\.\,\!\?\-\:\;\(\)]+')
+# Same character class as _DISALLOWED_RE, as a str.translate table for ASCII text
+_ASCII_DISALLOWED = {c: None for c in range(128) if _DISALLOWED_RE.match(chr(c))}
+
+
+def html_to_text(body: str) -> str:
+    """
+    Convert an HTML message body to plain text.
+    
+    Links are kept in markdown form, images and emphasis are dropped, and
+    lines are not wrapped. Code blocks come out indented by four spaces and
+    quotes prefixed with "> ".
+    
+    Args:
+        body: HTML body of a message
+        
+    Returns:
+        Plain text version of the body
+    """
+    h = HTML2Text()
+    h.ignore_links = False
+    h.body_width = 0  # Disable line wrapping
+    h.ignore_images = True  # Ignore images to avoid markup issues
+    h.ignore_emphasis = True  # Ignore emphasis to avoid markup issues
+    return h.handle(body)
+
+
+def sanitize_body(text: str) -> str:
+    """
+    Clean HTML2Text output for display in the terminal.
+    
+    Drops leftover HTML entities, unwraps markdown links, replaces bare URLs with
+    "URL", removes characters that could be read as markup and collapses
+    whitespace. Passes whose trigger character is absent are skipped, so most
+    bodies are scanned once for disallowed characters and once for whitespace.
+    
+    Args:
+        text: Plain text produced by HTML2Text
+        
+    Returns:
+        Sanitized single-line text
+    """
+    if '&' in text:
+        text = _ENTITY_RE.sub('', text)
+    if '](' in text:
+        text = _LINK_RE.sub(r'\1', text)
+    if '://' in text:
+        # The brackets of "[URL]" would be stripped as disallowed characters anyway
+        text = _URL_RE.sub('URL', text)
+    if text.isascii():
+        text = text.translate(_ASCII_DISALLOWED)
+    else:
+        text = _DISALLOWED_RE.sub('', text)
+    # str.split() and the regex \s agree on what counts as whitespace
+    return ' '.join(text.split())
+
 
 class MessageViewer(Static):
     """
@@ -15,6 +82,15 @@ class MessageViewer(Static):
     
     content = reactive(None)
     
+    # Number of formatted messages kept in the render cache
+    RENDER_CACHE_SIZE = 128
+    
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # (message id, body hash or location) -> formatted content, least recently used first
+        self._formatted_cache = OrderedDict()
+        self._formatted_cache_lock = threading.Lock()
+    
     def watch_content(self, value: dict) -> None:
         """
         Watch for changes to the content reactive variable and update the display.
@@ -23,41 +99,91 @@ class MessageViewer(Static):
             value: Dictionary containing message data with keys like 'id', 'subject', 
                    'body', 'postTime', 'viewHref', 'author'
         """
-        log.info(f"watch_content called with value: {value}")
-        
         # Check if we have valid message data
-        if not value or not isinstance(value, dict) or "body" not in value:
+        if not value or not isinstance(value, (dict, MessageRecord)) or "body" not in value:
             log.info("No valid message data, skipping update")
             return
+        
+        log.info(f"watch_content called for message {value.get('id')}")
+        
+        with span("viewer.update"):
+            # Create formatted display of all fields
+            formatted_content = self.render_message(value)
+            
+            # Update with formatted content
+            self.update(formatted_content)
+    
+    def _cache_key(self, message_data: dict) -> tuple:
+        # The body hash catches edits to a message that keep its id; records
+        # whose body is out of memory key on where it is read from instead
+        if isinstance(message_data, MessageRecord):
+            return (message_data.id, *message_data.content_key())
+        return (message_data["id"], hash(message_data["body"]))
+    
+    def render_message(self, message_data: dict) -> str:
+        """
+        Formatted display content for a message, served from the render cache when possible.
+        
+        Safe to call from worker threads.
+        
+        Args:
+            message_data: Dictionary containing message information
             
-        # Format all message data fields
-        message_data = value
-        
-        # Convert HTML body to plain text for better terminal display
-        h = HTML2Text()
-        h.ignore_links = False
-        h.body_width = 0  # Disable line wrapping
-        h.ignore_images = True  # Ignore images to avoid markup issues
-        h.ignore_emphasis = True  # Ignore emphasis to avoid markup issues
-        plain_text_body = h.handle(message_data["body"])
-        
-        # Clean the text to remove any remaining problematic characters
-        # Remove any remaining HTML entities and clean up whitespace
-        plain_text_body = re.sub(r'&[a-zA-Z0-9#]+;', '', plain_text_body)
-        # Remove any markdown-style links that might contain problematic characters
-        plain_text_body = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', plain_text_body)
-        # Remove any remaining URLs that might contain special characters
-        plain_text_body = re.sub(r'https?://[^\s]+', '[URL]', plain_text_body)
-        # Remove any remaining special characters that could cause markup issues
-        plain_text_body = re.sub(r'[^\w\s\.\,\!\?\-\:\;\(\)]', '', plain_text_body)
-        plain_text_body = re.sub(r'\s+', ' ', plain_text_body).strip()
-        
-        # Create formatted display of all fields
+        Returns:
+            Formatted string for display
+        """
+        key = self._cache_key(message_data)
+        with self._formatted_cache_lock:
+            cached = self._formatted_cache.get(key)
+            if cached is not None:
+                self._formatted_cache.move_to_end(key)
+                return cached
+        
+        # Read the body once: records may load it from disk on every access
+        body = message_data["body"]
+        with span("html.convert"):
+            # Convert HTML body to plain text for better terminal display
+            plain_text_body = html_to_text(body)
+            
+            # Clean the text to remove any remaining problematic characters
+            plain_text_body = sanitize_body(plain_text_body)
+        
         formatted_content = self._format_message_content(message_data, plain_text_body)
         
-        log.info(f"Formatted content length: {len(formatted_content)}")
-        # Update with formatted content
-        self.update(formatted_content)
+        with self._formatted_cache_lock:
+            self._formatted_cache[key] = formatted_content
+            self._formatted_cache.move_to_end(key)
+            while len(self._formatted_cache) > self.RENDER_CACHE_SIZE:
+                self._formatted_cache.popitem(last=False)
+        return formatted_content
+    
+    def prerender(self, messages: list) -> None:
+        """
+        Render messages in a background thread so they are cached before being shown.
+        
+        A newer call cancels the previous prerender batch.
+        
+        Args:
+            messages: Messages likely to be viewed next (e.g. neighbors of the selection)
+        """
+        # Cache hits are cheap in render_message; checking here would read the
+        # bodies (possibly from disk) on the UI thread
+        pending = [msg for msg in messages if msg and "body" in msg]
+        if pending:
+            self.run_worker(
+                partial(self._prerender_worker, pending),
+                name="prerender",
+                group="prerender",
+                exclusive=True,
+                thread=True,
+            )
+    
+    def _prerender_worker(self, messages: list) -> None:
+        worker = get_current_worker()
+        for msg in messages:
+            if worker.is_cancelled:
+                return
+            self.render_message(msg)
     
     def _format_message_content(self, message_data: dict, plain_text_body: str) -> str:
         """
@@ -87,6 +213,21 @@ class MessageViewer(Static):
 {plain_text_body}
 """
     
+    def show_header(self, message_data: dict) -> None:
+        """
+        Show a message's header fields right away, without reading or converting its body.
+        
+        Meant for the rows passed over while the selection is still moving;
+        set_message shows the full message once it settles.
+        
+        Args:
+            message_data: Dictionary containing message information
+        """
+        # Reset without the watcher so a following set_message always renders,
+        # even for the message that was shown before the preview
+        self.set_reactive(MessageViewer.content, None)
+        self.update(self._format_message_content(message_data, "[dim]Loading...[/dim]"))
+    
     def set_message(self, message_data: dict) -> None:
         """
         Set the message data to display.
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Khoros community, for testing and benchmarking the fetch path offline.
+
+Implements the two endpoints the fetch scripts use:
+
+- POST /<tapestry>/s/restapi/vc/authentication/sessions/login, the session
+  login of auth.authenticate()
+- POST /t5/s/api/2.1/graphql, the messages query of fetch_posts.py with
+  first/after cursor pagination (newest first)
+
+Messages are synthetic (see bench_data.synthetic_node): a pool of distinct
+messages is generated once and repeated under new ids and post times, so the
+server stays fast and small however large the community is.
+Latency, the largest page served, the share of failing requests and a
+request rate limit answered with 429 are configurable.
+
+Usage:
+    python mock_khoros.py --port 8765 --messages 100000 --latency 0.05
+    scheme=http hostname=127.0.0.1:8765 tapestry=t5 username=a password=b python fetch_posts.py --paginate --no-db
+"""
+
+import argparse
+import base64
+import datetime
+import json
+import math
+import random
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bench_data import synthetic_node
+
+GRAPHQL_PATH = "/t5/s/api/2.1/graphql"
+LOGIN_PATH = "/s/restapi/vc/authentication/sessions/login"
+
+_FIRST_RE = re.compile(r'messages\s*\(\s*first\s*:\s*(\$\w+|\d+)')
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.b64encode(f"offset:{offset}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Offset of the message after cursor; raises ValueError for a cursor this server did not issue"""
+    try:
+        prefix, offset = base64.b64decode(cursor.encode(), validate=True).decode().split(":")
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if prefix != "offset":
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return int(offset)
+
+
+class MockKhoros:
+    """
+    Mock Khoros server running in a background thread.
+
+    Counters of what it served are kept in `stats`, so a benchmark can report
+    how many requests were throttled or failed alongside its own timings.
+    """
+
+    # Distinct synthetic messages; larger communities repeat them
+    POOL_SIZE = 1000
+
+    def __init__(self, messages: int = 10000, latency: float = 0.0, jitter: float = 0.0,
+                 max_page_size: int = 1000, error_rate: float = 0.0, rate_limit: float = 0.0,
+                 burst: int = 10, username: str | None = None, password: str | None = None,
+                 tapestry: str = "t5", host: str = "127.0.0.1", port: int = 0, seed: int = 0) -> None:
+        """
+        Args:
+            messages: Number of messages in the community
+            latency: Seconds every request takes before it is answered
+            jitter: Extra random delay of up to this many seconds per request
+            max_page_size: Largest `first` honoured; larger pages are cut to this size
+            error_rate: Share of GraphQL requests (0 to 1) answered with a 500
+            rate_limit: Requests per second allowed before answering 429 (0 for no limit)
+            burst: Requests allowed at once before the rate limit applies
+            username: Login accepted by the login endpoint (None accepts any)
+            password: Password accepted by the login endpoint (None accepts any)
+            tapestry: First path segment of the login endpoint
+            host: Address to listen on
+            port: Port to listen on (0 picks a free one)
+            seed: Seed of the synthetic messages and of the injected errors
+        """
+        self.messages = messages
+        self.latency = latency
+        self.jitter = jitter
+        self.max_page_size = max_page_size
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.username = username
+        self.password = password
+        self.tapestry = tapestry
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.session_keys = set()
+        self.newest_post_time = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        self.pool = []
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.tokens_updated = time.monotonic()
+        self.stats = {"logins": 0, "requests": 0, "throttled": 0, "errors": 0, "messages": 0}
+
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.mock = self
+        self.thread = None
+
+    @property
+    def hostname(self) -> str:
+        """host:port to use as the `hostname` setting"""
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "MockKhoros":
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-khoros", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += amount
+
+    def node(self, offset: int) -> dict:
+        """Message at offset, newest first; the same offset always gives the same message"""
+        with self.lock:
+            if not self.pool:
+                rng = random.Random(self.seed)
+                self.pool = [synthetic_node(rng, i, self.newest_post_time) for i in range(self.POOL_SIZE)]
+        message_id = str(200000 + self.messages - offset)
+        post_time = self.newest_post_time - datetime.timedelta(minutes=10 * offset)
+        return {
+            **self.pool[offset % self.POOL_SIZE],
+            "id": message_id,
+            "postTime": post_time.isoformat(timespec="milliseconds"),
+            "viewHref": f"https://community.example.com/t5/discussions/m-p/{message_id}",
+        }
+
+    def throttled(self) -> float:
+        """Seconds until the next request is allowed, or 0 if this one may proceed"""
+        if not self.rate_limit:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.tokens_updated) * self.rate_limit)
+            self.tokens_updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate_limit
+
+    def delay(self) -> None:
+        if self.latency or self.jitter:
+            with self.lock:
+                extra = self.rng.random() * self.jitter
+            time.sleep(self.latency + extra)
+
+    def login(self, query: str) -> tuple:
+        """Response (status, body, headers) to a session login"""
+        params = parse_qs(query)
+        login = params.get("user.login", [""])[0]
+        password = params.get("user.password", [""])[0]
+        self.delay()
+        if (self.username is not None and login != self.username) or \
+                (self.password is not None and password != self.password):
+            # Khoros reports failed logins in the body of a 200 response
+            return 200, {"response": {"status": "error", "error": {
+                "code": 303, "message": "User authentication failed."}}}, {}
+        key = secrets.token_hex(16)
+        with self.lock:
+            self.session_keys.add(key)
+            self.stats["logins"] += 1
+        return 200, {"response": {"status": "success", "value": {"type": "string", "$": key}}}, {}
+
+    def graphql(self, session_key: str | None, payload: dict) -> tuple:
+        """Response (status, body, headers) to a messages query"""
+        self.count("requests")
+        wait = self.throttled()
+        if wait:
+            self.count("throttled")
+            return 429, {"errors": [{"message": "Too Many Requests"}]}, {"Retry-After": str(math.ceil(wait))}
+        self.delay()
+        if session_key not in self.session_keys:
+            return 401, {"errors": [{"message": "Invalid or missing session key"}]}, {}
+        with self.lock:
+            failed = self.rng.random() < self.error_rate
+        if failed:
+            self.count("errors")
+            return 500, {"errors": [{"message": "Internal server error"}]}, {}
+
+        query = payload.get("query") or ""
+        variables = payload.get("variables") or {}
+        match = _FIRST_RE.search(query)
+        if not match:
+            return 400, {"errors": [{"message": "Only the messages(first: ...) query is supported"}]}, {}
+        first = match.group(1)
+        first = variables.get(first[1:]) if first.startswith("$") else int(first)
+        try:
+            start = decode_cursor(variables["after"]) if variables.get("after") else 0
+        except ValueError as e:
+            return 400, {"errors": [{"message": str(e)}]}, {}
+        if not isinstance(first, int) or first < 0:
+            return 400, {"errors": [{"message": "first must be a non-negative integer"}]}, {}
+
+        end = min(start + min(first, self.max_page_size), self.messages)
+        edges = [{"node": self.node(offset)} for offset in range(start, end)]
+        self.count("messages", len(edges))
+        page_info = {"hasNextPage": end < self.messages, "endCursor": encode_cursor(end) if edges else None}
+        return 200, {"data": {"messages": {"edges": edges, "pageInfo": page_info}}}, {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real community; without TCP_NODELAY the separate header
+    # and body writes stall on delayed ACKs once a connection is reused
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        mock = self.server.mock
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if url.path == f"/{mock.tapestry}{LOGIN_PATH}":
+            self.respond(*mock.login(url.query))
+        elif url.path == GRAPHQL_PATH:
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                self.respond(400, {"errors": [{"message": "Request body is not JSON"}]}, {})
+                return
+            self.respond(*mock.graphql(self.headers.get("li-api-session-key"), payload))
+        else:
+            self.respond(404, {"errors": [{"message": f"Not found: {url.path}"}]}, {})
+
+    def respond(self, status: int, body: dict, headers: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock Khoros community for the fetch scripts')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--messages', type=int, default=10000, help='Messages in the community (default: 10000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Random extra seconds per request, up to (default: 0)')
+    parser.add_argument('--max-page-size', type=int, default=1000, help='Largest page served (default: 1000)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of GraphQL requests answered with a 500, 0 to 1 (default: 0)')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='GraphQL requests per second before answering 429, 0 for none (default: 0)')
+    parser.add_argument('--burst', type=int, default=10,
+                        help='Requests allowed at once under --rate-limit (default: 10)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic messages (default: 0)')
+    args = parser.parse_args()
+
+    mock = MockKhoros(messages=args.messages, latency=args.latency, jitter=args.jitter,
+                      max_page_size=args.max_page_size, error_rate=args.error_rate, rate_limit=args.rate_limit,
+                      burst=args.burst, host=args.host, port=args.port, seed=args.seed)
+    print(f"Mock Khoros community of {args.messages} messages on http://{mock.hostname}")
+    print(f"Point the fetch scripts at it with: scheme=http hostname={mock.hostname} tapestry={mock.tapestry}")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.server.server_close()
+        print(f"Served: {mock.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import re
+
+from message_viewer import html_to_text
+
+
+# Rough size of a token for English text; good enough for budgeting, the API
+# reports the exact count after the call
+CHARS_PER_TOKEN = 4
+
+# Share of the budget that quoted code may take when a post has to be trimmed
+CODE_SHARE = 0.25
+
+# Share of the remaining prose budget kept from the start of the post; the rest comes from the end
+HEAD_SHARE = 2 / 3
+
+_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_URL_RE = re.compile(r'https?://[^\s]+')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+
+PROMPT_TEMPLATE = """Please provide a concise summary of the following message from a community forum.
+
+Subject: {subject}
+Author: {author}
+Content:
+{content}
+
+Please summarize the key points in 2-3 sentences, focusing on:
+- The main topic or question
+- Any specific requests or issues mentioned
+- The overall tone and context
+
+Keep the summary clear and professional."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate number of tokens the model will count for text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def message_text(body: str) -> str:
+    """
+    Plain text of an HTML body for use in a prompt.
+
+    Converted like the message viewer does, but keeping line structure and
+    punctuation (code needs both). Markdown links are unwrapped and bare URLs
+    replaced with "URL", since they cost many tokens and say little.
+    """
+    text = html_to_text(body or "")
+    if '](' in text:
+        text = _LINK_RE.sub(r'\1', text)
+    if '://' in text:
+        text = _URL_RE.sub('URL', text)
+    text = '\n'.join(line.rstrip() for line in text.splitlines())
+    return _BLANK_LINES_RE.sub('\n\n', text).strip('\n')
+
+
+def split_code(text: str) -> tuple:
+    """
+    Separate quoted code from prose.
+
+    Code is what HTML2Text produces for <pre> blocks: lines indented by four
+    spaces or a tab, and the blank lines between them.
+
+    Returns:
+        (prose, code_blocks): the text without code, and the code blocks in order
+    """
+    prose = []
+    blocks = []
+    block = []
+    for line in text.split('\n'):
+        if line.startswith(('    ', '\t')) or (block and not line):
+            block.append(line)
+            continue
+        if block:
+            blocks.append('\n'.join(block).strip('\n'))
+            block = []
+            if prose and prose[-1]:
+                prose.append('')
+        prose.append(line)
+    if block:
+        blocks.append('\n'.join(block).strip('\n'))
+    return '\n'.join(prose).strip('\n'), blocks
+
+
+def _head(text: str, max_chars: int) -> str:
+    """At most max_chars from the start of text, cut at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(' ', 0, max_chars + 1)
+    return text[:cut if cut > 0 else max_chars].rstrip()
+
+
+def _tail(text: str, max_chars: int) -> str:
+    """At most max_chars from the end of text, cut at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    start = len(text) - max_chars
+    cut = text.find(' ', start - 1)
+    return text[cut + 1 if 0 <= cut < len(text) - 1 else start:].lstrip()
+
+
+def trim_to_budget(text: str, max_tokens: int) -> tuple:
+    """
+    Shorten text to roughly max_tokens, keeping what matters most for a summary.
+
+    Text within the budget is returned unchanged. Otherwise quoted code is kept
+    (up to CODE_SHARE of the budget) and the prose is cut down to its beginning
+    and end, with a marker where the middle was left out.
+
+    Args:
+        text: Plain text from message_text()
+        max_tokens: Token budget for the returned text
+
+    Returns:
+        (text, trimmed) where trimmed tells whether anything was left out
+    """
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return text, False
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    prose, blocks = split_code(text)
+
+    code = []
+    code_chars = 0
+    code_budget = int(max_chars * CODE_SHARE) if prose else max_chars
+    for block in blocks:
+        room = code_budget - code_chars
+        if room <= 0:
+            break
+        if len(block) > room:
+            # Whole lines only, so the code stays readable
+            lines = []
+            used = 0
+            for line in block.split('\n'):
+                used += len(line) + 1
+                if used > room:
+                    break
+                lines.append(line)
+            if not lines:
+                break
+            block = '\n'.join(lines + ['    ...'])
+        code.append(block)
+        code_chars += len(block) + 2
+
+    prose_chars = max_chars - code_chars
+    if len(prose) > prose_chars:
+        head = _head(prose, int(prose_chars * HEAD_SHARE))
+        tail = _tail(prose, prose_chars - len(head))
+        omitted = len(prose.split()) - len(head.split()) - len(tail.split())
+        prose = f"{head}\n\n[... {max(omitted, 0)} words omitted ...]\n\n{tail}"
+
+    parts = [prose] if prose else []
+    if code:
+        parts.append("Code quoted in the message:\n\n" + '\n\n'.join(code))
+    return '\n\n'.join(parts), True
+
+
+def author_name(author) -> str:
+    """
+    Display name of a message author for prompts.
+
+    Store-backed records keep missing name parts as None rather than "", so
+    both are treated as absent.
+    """
+    author = author or {}
+    name = f"{author.get('firstName') or ''} {author.get('lastName') or ''}".strip()
+    return name or "Unknown author"
+
+
+def build_summary_prompt(message_data, max_tokens: int) -> tuple:
+    """
+    Build the summarization prompt for a message.
+
+    Args:
+        message_data: Message dict or MessageRecord
+        max_tokens: Token budget for the message content (0 for no limit)
+
+    Returns:
+        (prompt, stats) where stats describes the input size: body_chars (raw
+        HTML), text_chars (after conversion), prompt_chars, estimated_tokens
+        and trimmed
+    """
+    subject = message_data.get('subject') or 'No subject'
+    body = message_data.get('body') or ''
+
+    text = message_text(body)
+    content, trimmed = trim_to_budget(text, max_tokens)
+    prompt = PROMPT_TEMPLATE.format(
+        subject=subject, author=author_name(message_data.get('author')), content=content or 'No content'
+    )
+    stats = {
+        "message_id": message_data.get('id'),
+        "body_chars": len(body),
+        "text_chars": len(text),
+        "prompt_chars": len(prompt),
+        "estimated_tokens": estimate_tokens(prompt),
+        "trimmed": trimmed,
+    }
+    return prompt, stats
@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+
+
+class SummaryError(Exception):
+    """A summary could not be generated; the message is meant to be shown to the user"""
+
+
+class SummarizerBackend(ABC):
+    """
+    Interface shared by the summarizers.
+
+    A backend turns one message into a short summary. Remote backends may be
+    unavailable (no API key) or slow, so callers check is_available() and can
+    show a result from a fast backend while waiting for a better one.
+    """
+
+    # Shown in status messages
+    name = "Summarizer"
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Whether summarize_message can be expected to succeed"""
+
+    def cached_summary(self, message_data: dict):
+        """Summary of this exact message if it is available without any work, or None"""
+        return None
+
+    @abstractmethod
+    async def summarize_message(self, message_data: dict, on_chunk=None) -> str:
+        """
+        Summarize a message.
+
+        Args:
+            message_data: Message dict or MessageRecord
+            on_chunk: Optional callback receiving the partial summary while it is generated;
+                      backends that produce the summary at once may ignore it
+
+        Returns:
+            The summary
+
+        Raises:
+            SummaryError: If no summary could be generated
+        """
+
+    def get_status_message(self) -> str:
+        """Get a status message about the backend's availability"""
+        return f"{self.name}: {'Available' if self.is_available() else 'Not available'}"
@@ -0,0 +1,109 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    message_id TEXT NOT NULL,
+    body_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (message_id, body_hash, model, prompt_version)
+);
+
+CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries (accessed);
+"""
+
+
+def body_hash(body: str) -> str:
+    """Stable hash of a message body, so an edited post is summarized again"""
+    return hashlib.sha256((body or "").encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    Persistent SQLite cache of generated summaries.
+
+    Entries are keyed by message id, body hash, model name and prompt version,
+    so a summary is reused only for the exact same input. When the stored
+    summaries grow past max_bytes, the least recently used ones are evicted.
+    """
+
+    def __init__(self, db_path: str = "summaries.db", max_bytes: int = 16 * 1024 * 1024) -> None:
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        # Shared between the UI and background summarization, serialized by the lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def get(self, message_id: str, body: str, model: str, prompt_version: str):
+        """
+        Look up a cached summary, marking it as recently used.
+
+        Returns:
+            The summary, or None if there is no entry for this exact input
+        """
+        key = (message_id, body_hash(body), model, prompt_version)
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                """
+                SELECT summary FROM summaries
+                WHERE message_id = ? AND body_hash = ? AND model = ? AND prompt_version = ?
+                """,
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                """
+                UPDATE summaries SET accessed = ?
+                WHERE message_id = ? AND body_hash = ? AND model = ? AND prompt_version = ?
+                """,
+                (time.time(), *key),
+            )
+        return row[0]
+
+    def put(self, message_id: str, body: str, model: str, prompt_version: str, summary: str) -> None:
+        """Store a summary, then evict least recently used entries if over max_bytes"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO summaries
+                    (message_id, body_hash, model, prompt_version, summary, size, created, accessed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (message_id, body_hash(body), model, prompt_version, summary,
+                 len(summary.encode("utf-8")), now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        doomed = []
+        rows = self.conn.execute("SELECT rowid, size FROM summaries ORDER BY accessed").fetchall()
+        for rowid, size in rows:
+            doomed.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        self.conn.executemany("DELETE FROM summaries WHERE rowid = ?", doomed)
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
@@ -0,0 +1,243 @@
+import asyncio
+import itertools
+import time
+
+from textual import log
+
+
+class TokenBucket:
+    """
+    Async token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    acquire() takes one token, waiting until one is available. A rate of 0
+    (or less) means no limit.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; returns 0, or else the seconds until one will be"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+
+class SummaryJob:
+    """A message waiting for (or being given) a summary"""
+
+    def __init__(self, message: dict, priority: int, future: asyncio.Future, on_chunk=None) -> None:
+        self.message = message
+        self.priority = priority
+        self.future = future
+        # Receives the partial summary while it streams in, if set before the job starts
+        self.on_chunk = on_chunk
+        self.started = False
+        # Whether the summary is being streamed, i.e. someone watched it when it started
+        self.streaming = False
+        # The summary cache is looked up once, when a worker first takes the job
+        self.cache_checked = False
+        self.checking = False
+
+
+class SummaryScheduler:
+    """
+    Background summarization queue shared by on-demand requests and prefetching.
+
+    Jobs run in priority order (a message the user asked for, then the
+    selected message, then its neighbors) with at most `concurrency` API calls
+    in flight, and no more than `rate_per_minute` calls started per minute.
+    Results land in the summarizer's cache, so a later request for the same
+    message is instant. The cache is checked by the workers, off the event
+    loop, so queueing work never reads bodies or the cache on the UI thread.
+    """
+
+    # Lower runs first
+    PRIORITY_REQUESTED = 0
+    PRIORITY_SELECTED = 1
+    PRIORITY_PREFETCH = 2
+
+    def __init__(self, summarizer, concurrency: int = 2, rate_per_minute: float = 15, burst: float = 3) -> None:
+        """
+        Args:
+            summarizer: Summarizer backend, e.g. GeminiSummarizer
+            concurrency: Maximum number of summaries generated at the same time
+            rate_per_minute: Sustained limit of API calls per minute, e.g. the model's quota (0 for no limit)
+            burst: Number of calls that may start back to back before the rate applies
+        """
+        self.summarizer = summarizer
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate_per_minute / 60, burst)
+        self.queue = asyncio.PriorityQueue()
+        # Message id -> pending or running job
+        self.jobs = {}
+        self._sequence = itertools.count()
+
+    def _new_future(self) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        # Nobody awaits a prefetch; mark its failure as seen (it is logged by the worker)
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+
+    def _enqueue(self, job: SummaryJob) -> None:
+        # (priority, insertion order, id); entries whose priority no longer matches the job are stale
+        self.queue.put_nowait((job.priority, next(self._sequence), job.message["id"]))
+
+    def request(self, message: dict, on_chunk=None) -> asyncio.Future:
+        """
+        Summarize a message ahead of any prefetch work.
+
+        Args:
+            message: Message to summarize
+            on_chunk: Optional callback for the partial summary while it streams in.
+                      Not called if the message was already being summarized without
+                      streaming (e.g. as a prefetch); the future still brings the result.
+
+        Returns:
+            Future resolving to the summary, or to the summarizer's SummaryError.
+            If the message is already queued or being summarized, that job's
+            future is shared.
+        """
+        job = self.jobs.get(message["id"])
+        if job is None:
+            job = SummaryJob(message, self.PRIORITY_REQUESTED, self._new_future(), on_chunk)
+            self.jobs[message["id"]] = job
+            self._enqueue(job)
+        elif job.streaming:
+            # Already streaming for an earlier request: the new one watches from here on
+            job.on_chunk = on_chunk
+        elif not job.started:
+            job.on_chunk = on_chunk
+            if job.priority != self.PRIORITY_REQUESTED:
+                job.priority = self.PRIORITY_REQUESTED
+                self._enqueue(job)
+        return job.future
+
+    def release(self, message_id: str) -> None:
+        """
+        Detach whoever requested a message's summary, e.g. because the selection moved.
+
+        A job that has not started is dropped, saving the API call. One already
+        running stops streaming but still completes, so its result is cached.
+        """
+        job = self.jobs.get(message_id)
+        if job is None:
+            return
+        job.on_chunk = None
+        if not job.started:
+            del self.jobs[message_id]
+            job.future.cancel()
+
+    def prefetch(self, messages: list, selected: dict = None) -> None:
+        """
+        Queue background summaries for messages likely to be viewed next.
+
+        Replaces the previous prefetch set: queued prefetch jobs for messages not
+        in `messages` are dropped. Messages are summarized in the order given,
+        so pass the most likely one first. Messages already cached are skipped
+        by the workers without an API call.
+
+        Args:
+            messages: Messages to summarize in the background
+            selected: The selected message, if it is among them; it goes before the others
+        """
+        selected_id = selected["id"] if selected is not None else None
+        wanted = {message["id"] for message in messages}
+        for message_id, job in list(self.jobs.items()):
+            if job.started or job.priority == self.PRIORITY_REQUESTED:
+                continue
+            if message_id not in wanted:
+                del self.jobs[message_id]
+                job.future.cancel()
+            elif job.priority == self.PRIORITY_SELECTED and message_id != selected_id:
+                # No longer selected, but still a neighbor
+                job.priority = self.PRIORITY_PREFETCH
+                self._enqueue(job)
+        for message in messages:
+            priority = self.PRIORITY_SELECTED if message["id"] == selected_id else self.PRIORITY_PREFETCH
+            job = self.jobs.get(message["id"])
+            if job is None:
+                job = SummaryJob(message, priority, self._new_future())
+                self.jobs[message["id"]] = job
+                self._enqueue(job)
+            elif not job.started and priority < job.priority:
+                job.priority = priority
+                self._enqueue(job)
+
+    async def run(self) -> None:
+        """Process jobs forever; run it as a worker of the app"""
+        await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+
+    async def _worker(self) -> None:
+        while True:
+            entry = await self.queue.get()
+            priority, _, message_id = entry
+            job = self.jobs.get(message_id)
+            if job is None or job.started or job.checking or job.priority != priority:
+                continue
+
+            summary = None
+            if not job.cache_checked:
+                # Reads the body and the SQLite cache, so keep it off the event loop
+                job.checking = True
+                try:
+                    summary = await asyncio.to_thread(self.summarizer.cached_summary, job.message)
+                finally:
+                    job.checking = False
+                job.cache_checked = True
+                if self.jobs.get(message_id) is not job:
+                    # Released while the cache was read
+                    continue
+                if summary is None and job.priority != priority:
+                    # Reprioritized meanwhile; the entry for the new priority was skipped above
+                    self._enqueue(job)
+                    continue
+            if summary is None:
+                delay = self.bucket.try_acquire()
+                if delay:
+                    # Over the rate limit: put the job back and wait, so that whatever
+                    # has the highest priority by then is what gets the next token
+                    self.queue.put_nowait(entry)
+                    await asyncio.sleep(delay)
+                    continue
+            job.started = True
+            try:
+                if summary is None:
+                    log.info(f"Generating summary for message {message_id} (priority {job.priority})")
+                    # Stream only if someone is watching now; unwatched prefetches use a plain
+                    # request. on_chunk is looked up per chunk, so release() stops the
+                    # streaming mid-way
+                    job.streaming = job.on_chunk is not None
+                    summary = await self.summarizer.summarize_message(
+                        job.message,
+                        on_chunk=(lambda text: job.on_chunk and job.on_chunk(text)) if job.streaming else None,
+                    )
+                if not job.future.done():
+                    job.future.set_result(summary)
+            except Exception as e:
+                log.warning(f"Summary for message {message_id} failed: {e}")
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                if self.jobs.get(message_id) is job:
+                    del self.jobs[message_id]
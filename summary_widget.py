@@ -1,6 +1,7 @@
 from textual.widgets import Static
 from textual.reactive import reactive
 from textual import log
+from rich.markup import escape
 
 
 class SummaryWidget(Static):
@@ -13,14 +14,24 @@ class SummaryWidget(Static):
     
     summary_text = reactive("")
     is_loading = reactive(False)
+    title = reactive("AI Summary")
+    
+    # Maximum repaints per second while a summary is streaming in
+    STREAM_FPS = 30
     
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
         self.styles.display = "none"  # Hidden by default
+        # Latest partial summary not painted yet, and the throttle window timer
+        self._pending_partial = None
+        self._stream_timer = None
+        # Quick summary shown until the real one arrives (see set_preview)
+        self.preview_text = None
     
-    def show_summary(self) -> None:
+    def show_summary(self, title: str = "AI Summary") -> None:
         """Show the summary widget"""
         log.info("SummaryWidget.show_summary() called")
+        self.title = title
         self.styles.display = "block"
         self.focus()
         log.info(f"SummaryWidget display style set to: {self.styles.display}")
@@ -29,6 +40,8 @@ class SummaryWidget(Static):
         """Hide the summary widget"""
         log.info("SummaryWidget.hide_summary() called")
         self.styles.display = "none"
+        self._stop_stream()
+        self.preview_text = None
         self.summary_text = ""
         self.is_loading = False
         log.info(f"SummaryWidget display style set to: {self.styles.display}")
@@ -40,9 +53,63 @@ class SummaryWidget(Static):
             self.summary_text = "Generating summary..."
         self.refresh()
     
+    def set_preview(self, text: str, note: str) -> None:
+        """
+        Show a quick summary, e.g. from the local summarizer, while a better one is generated.
+        
+        The preview stays until the first streamed chunk or set_summary replaces it.
+        
+        Args:
+            text: Preview summary (plain text, not markup)
+            note: Shown dimmed under the preview, e.g. what is being waited for
+        """
+        self._stop_stream()
+        self.preview_text = text
+        self.summary_text = f"{escape(text)}\n[dim]{escape(note)}[/dim]"
+        self.is_loading = False
+    
+    def set_progress(self, text: str) -> None:
+        """Show a progress message (plain text) in the loading state, e.g. while a digest is built"""
+        self._stop_stream()
+        self.preview_text = None
+        self.summary_text = escape(text)
+        self.is_loading = True
+    
+    def stream_summary(self, partial: str) -> None:
+        """
+        Show a partially generated summary (plain text, not markup).
+        
+        The first chunk is painted right away; after that repaints are limited to
+        STREAM_FPS per second, always ending on the latest text.
+        """
+        self._pending_partial = partial
+        if self._stream_timer is None:
+            self._paint_partial()
+            self._stream_timer = self.set_timer(1 / self.STREAM_FPS, self._end_stream_window)
+    
+    def _paint_partial(self) -> None:
+        self.preview_text = None
+        # Model output may contain [brackets]; escaped so it is never parsed as markup
+        self.summary_text = escape(self._pending_partial)
+        self._pending_partial = None
+        self.is_loading = False
+    
+    def _end_stream_window(self) -> None:
+        self._stream_timer = None
+        if self._pending_partial is not None:
+            self.stream_summary(self._pending_partial)
+    
+    def _stop_stream(self) -> None:
+        if self._stream_timer is not None:
+            self._stream_timer.stop()
+            self._stream_timer = None
+        self._pending_partial = None
+    
     def set_summary(self, summary: str) -> None:
-        """Set the summary text"""
-        self.summary_text = summary
+        """Set the summary text (plain text, not markup)"""
+        self._stop_stream()
+        self.preview_text = None
+        self.summary_text = escape(summary)
         self.is_loading = False
         self.refresh()
     
@@ -52,11 +119,11 @@ class SummaryWidget(Static):
         
         if self.is_loading:
             return f"""
-[bold blue]AI Summary[/bold blue]
+[bold blue]{self.title}[/bold blue]
 [dim]⠋ {self.summary_text}[/dim]
 """
         else:
             return f"""
-[bold blue]AI Summary[/bold blue]
+[bold blue]{self.title}[/bold blue]
 {self.summary_text}
 """
@@ -0,0 +1,37 @@
+import unittest
+
+from message_digest import SEPARATOR, format_post, pack
+from message_record import MessageRecord
+
+
+def record(message_id: str, first_name, last_name, body: str = "<p>Sync fails after the update.</p>") -> MessageRecord:
+    return MessageRecord(
+        id=message_id, subject="Sync fails", postTime="2025-01-01T10:00:00.000+00:00",
+        viewHref=f"https://community.example.com/t5/discussions/m-p/{message_id}",
+        author={"title": None, "firstName": first_name, "lastName": last_name}, age="1d ago", body=body,
+    )
+
+
+class FormatPostTest(unittest.TestCase):
+    def test_author_with_missing_parts(self):
+        post = format_post(record("1", None, "Smith"), 300)
+        self.assertIn("(by Smith, 2025-01-01", post)
+        self.assertNotIn("None", post)
+        self.assertIn("Unknown author", format_post(record("2", None, None), 300))
+
+    def test_body_is_plain_text(self):
+        post = format_post(record("1", "Sam", "Chen"), 300)
+        self.assertTrue(post.endswith("Sync fails after the update."))
+
+
+class PackTest(unittest.TestCase):
+    def test_groups_fit_budget(self):
+        items = ["x" * 400] * 10
+        groups = pack(items, 300)
+        self.assertEqual(sum(len(group) for group in groups), 10)
+        for group in groups:
+            self.assertLessEqual(len(SEPARATOR.join(group)) // 4, 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
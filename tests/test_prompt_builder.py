@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from message_list import iter_messages_from_store
+from message_store import MessageStore
+from prompt_builder import author_name, build_summary_prompt
+
+
+def node(message_id: str, first_name, last_name) -> dict:
+    return {
+        "id": message_id,
+        "subject": "Autofill stopped working",
+        "postTime": "2025-01-01T10:00:00.000+00:00",
+        "viewHref": f"https://community.example.com/t5/discussions/m-p/{message_id}",
+        "body": "<p>Autofill no longer fills the login form since the last update.</p>",
+        "author": {"title": None, "firstName": first_name, "lastName": last_name},
+    }
+
+
+class AuthorNameTest(unittest.TestCase):
+    def test_missing_parts(self):
+        self.assertEqual(author_name({"firstName": None, "lastName": "Smith"}), "Smith")
+        self.assertEqual(author_name({"firstName": "Sam"}), "Sam")
+        self.assertEqual(author_name({"firstName": None, "lastName": None}), "Unknown author")
+        self.assertEqual(author_name(None), "Unknown author")
+
+
+class StoreRecordPromptTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = MessageStore(os.path.join(self.directory.name, "messages.db"))
+        self.store.upsert_messages([node("1", None, "Smith"), node("2", "Sam", "Chen"), node("3", "", None)])
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_prompt_from_store_record(self):
+        records = {record["id"]: record for record in iter_messages_from_store(self.store)}
+
+        prompt, stats = build_summary_prompt(records["1"], 2000)
+        self.assertIn("Smith", prompt)
+        self.assertNotIn("None", prompt)
+        self.assertIn("Autofill no longer fills the login form", prompt)
+        self.assertEqual(stats["message_id"], "1")
+
+        prompt, _ = build_summary_prompt(records["2"], 2000)
+        self.assertIn("Sam Chen", prompt)
+
+        prompt, _ = build_summary_prompt(records["3"], 2000)
+        self.assertIn("Unknown author", prompt)
+        self.assertNotIn("None", prompt)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import time
+from collections import deque
+
+
+# Number of most recent span timings kept across all span names
+TRACE_BUFFER_SIZE = 4096
+
+
+class _NullSpan:
+    """Span used while tracing is off: entering and leaving it does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer: "Tracer", name: str) -> None:
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.tracer.buffer.append((self.name, time.perf_counter() - self.start))
+
+
+class Tracer:
+    """
+    Records how long named spans of code take, in a fixed-size ring buffer.
+
+    Use it as `with tracer.span("filter"): ...`. While tracing is disabled
+    span() returns a shared no-op context manager, so instrumented code pays
+    for one attribute check. Spans may be recorded from any thread.
+    """
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE, enabled: bool = False) -> None:
+        self.enabled = enabled
+        # (span name, seconds), oldest first
+        self.buffer = deque(maxlen=size)
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a span timed by the caller, e.g. one that starts and ends in different methods"""
+        if self.enabled:
+            self.buffer.append((name, seconds))
+
+    def clear(self) -> None:
+        self.buffer.clear()
+
+    def stats(self) -> dict:
+        """
+        Summary of the recorded spans.
+
+        Returns:
+            Span name -> (count, p50, p95, max) in seconds, in order of first appearance
+        """
+        # list() copies the deque without letting other threads append halfway
+        samples = {}
+        for name, seconds in list(self.buffer):
+            samples.setdefault(name, []).append(seconds)
+        stats = {}
+        for name, values in samples.items():
+            values.sort()
+            count = len(values)
+            stats[name] = (count, values[(count - 1) // 2], values[int((count - 1) * 0.95)], values[-1])
+        return stats
+
+
+# TRACE=1 records spans from startup (e.g. to time loading); otherwise
+# tracing is on only while the debug window (d) is shown
+TRACE_ENABLED = os.getenv("TRACE", "0") == "1"
+
+# Shared tracer
+tracer = Tracer(enabled=TRACE_ENABLED)
+
+
+def span(name: str):
+    """Context manager timing a block as span `name` of the shared tracer"""
+    return tracer.span(name)